@@ -1,8 +1,10 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 import datetime
 import os
 from functools import wraps
 
+from utils.json_response import json_response
+
 auth_routes = Blueprint('auth', __name__)
 
 # Secret key should be loaded from environment variables in production
@@ -31,7 +33,7 @@ def token_required(f):
                 token = auth_header.split(' ')[1]
         
         if not token:
-            return jsonify({'message': 'Token is missing!'}), 401
+            return json_response({'message': 'Token is missing!'}), 401
         
         try:
             # In production, use a proper JWT library
@@ -40,7 +42,7 @@ def token_required(f):
                 raise Exception("Invalid token")
             current_user = 'admin@space-debris.org'  # Placeholder
         except:
-            return jsonify({'message': 'Token is invalid!'}), 401
+            return json_response({'message': 'Token is invalid!'}), 401
             
         return f(current_user, *args, **kwargs)
     
@@ -51,18 +53,18 @@ def login():
     auth = request.json
     
     if not auth or not auth.get('email') or not auth.get('password'):
-        return jsonify({'message': 'Missing email or password'}), 401
+        return json_response({'message': 'Missing email or password'}), 401
     
     if auth['email'] not in USERS:
-        return jsonify({'message': 'User not found!'}), 401
+        return json_response({'message': 'User not found!'}), 401
         
     if USERS[auth['email']]['password'] != auth['password']:
-        return jsonify({'message': 'Invalid password!'}), 401
+        return json_response({'message': 'Invalid password!'}), 401
     
     # In production, use a proper JWT implementation
     token = 'valid_token_placeholder'
     
-    return jsonify({
+    return json_response({
         'token': token,
         'user': {
             'email': auth['email'],
@@ -73,7 +75,7 @@ def login():
 @auth_routes.route('/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
-    return jsonify({
+    return json_response({
         'email': current_user,
         'role': USERS[current_user]['role'] if current_user in USERS else 'unknown'
     }) 
\ No newline at end of file
@@ -1,87 +1,218 @@
-from flask import Blueprint, jsonify, request
-import pandas as pd
-import os
+from flask import Blueprint, Response, request
+import base64
+import binascii
+import io
 import json
 
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow export is optional
+    pa = None
+
+from api.auth import token_required
+from utils.catalog import catalog_store
+from utils.catalog_index import INT64
+from utils.filter_expr import apply_filter
+from utils.ingest import parse_delta
+from utils.json_response import json_response
+from utils.name_search import normalize_name
+from utils.response_cache import cached_response
+
 # Create blueprint
 debris_routes = Blueprint('debris_routes', __name__)
 
-# Get the absolute path to the project root directory
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
-DATA_PATH = os.path.join(PROJECT_ROOT, 'space_debris_website', 'data', 'space_decay.csv')
+# Largest page a single request may ask for
+MAX_PAGE_LIMIT = 1000
+
+# Rows serialized per chunk by the streaming export
+EXPORT_CHUNK_ROWS = 5000
+
+# Largest number of results a name search may return
+MAX_SEARCH_LIMIT = 100
+
+# Fields returned for each name search match
+SEARCH_FIELDS = ['NORAD_CAT_ID', 'OBJECT_NAME', 'OBJECT_ID', 'OBJECT_TYPE', 'COUNTRY_CODE']
 
-print(f"Project root: {PROJECT_ROOT}")
-print(f"Data path: {DATA_PATH}")
+# Query parameter prefix -> column for range filters (e.g. periapsis_min=400)
+RANGE_FILTERS = {
+    'periapsis': 'PERIAPSIS',
+    'apoapsis': 'APOAPSIS',
+    'inclination': 'INCLINATION',
+    'period': 'PERIOD',
+    'altitude': 'ALTITUDE_KM'
+}
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
 
 def load_data():
-    """Load the space debris data from CSV file"""
+    """Get the space debris data from the shared catalog store"""
+    return catalog_store.load()
+
+def range_bound(param):
+    """Read one optional range bound, rejecting values that are not numbers"""
+    value = request.args.get(param, default=None, type=str)
+    if value is None:
+        return None
     try:
-        print(f"Current working directory: {os.getcwd()}")
-        print(f"Attempting to load data from: {DATA_PATH}")
-        print(f"Does file exist? {os.path.exists(DATA_PATH)}")
-        
-        if not os.path.exists(DATA_PATH):
-            alt_path = os.path.join(os.getcwd(), 'space_debris_website', 'data', 'space_decay.csv')
-            print(f"Trying alternative path: {alt_path}")
-            if os.path.exists(alt_path):
-                print("Found file at alternative path")
-                return pd.read_csv(alt_path), None
-            print(f"Data file not found at path: {DATA_PATH}")
-            return None, "Data file not found"
-            
-        print(f"Loading data from: {DATA_PATH}")
-        df = pd.read_csv(DATA_PATH)
-        print(f"Data loaded. Shape: {df.shape if df is not None else 'None'}")
-        
-        if df is None or len(df) == 0:
-            print("Data file is empty")
-            return None, "Data file is empty"
-            
-        print(f"Successfully loaded {len(df)} rows of data")
-        print(f"Columns: {df.columns.tolist()}")
-        return df, None
-    except Exception as e:
-        error_msg = f"Error loading data: {str(e)}"
-        print(error_msg)
-        print(f"Current working directory: {os.getcwd()}")
-        print(f"Attempted data path: {DATA_PATH}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
-        return None, error_msg
+        bound = float(value)
+    except ValueError:
+        bound = float('nan')
+    if bound != bound:
+        raise ValueError(f"Invalid value for {param}: {value!r} is not a number")
+    return bound
+
+def range_filters():
+    """
+    Read the optional <name>_min / <name>_max range filters
+
+    Raises:
+        ValueError: if a bound is present but not a number
+    """
+    return {
+        column: (range_bound(f'{name}_min'), range_bound(f'{name}_max'))
+        for name, column in RANGE_FILTERS.items()
+    }
+
+def requested_columns(df):
+    """
+    Parse the `fields` projection into column positions
+
+    Returns:
+        list or None: positions of the requested columns, or None for all columns
+
+    Raises:
+        ValueError: if a requested field is not a catalog column
+    """
+    fields = request.args.get('fields', default=None, type=str)
+    if not fields:
+        return None
+    # A field named twice is returned once, at its first position
+    names = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    unknown = [name for name in names if name not in df.columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(df.columns.get_indexer(names))
+
+def select_rows(df, rows, columns):
+    """Take rows (a slice or positions) and optionally a subset of columns"""
+    if columns is None:
+        return df.iloc[rows]
+    return df.iloc[rows, columns]
+
+def serialize_rows(page_df, shape):
+    """Serialize a page as a list of records or as one list per column"""
+    if shape == 'columnar':
+        return {column: page_df[column].tolist() for column in page_df.columns}
+    return page_df.to_dict(orient='records')
+
+def encode_cursor(norad_id):
+    """Encode the last NORAD id of a page as an opaque cursor"""
+    payload = json.dumps({'after': norad_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor into the NORAD id to continue after (None for the first page)"""
+    if not cursor:
+        return None
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode()))['after']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(after, (int, float)):
+        raise ValueError('Invalid cursor')
+    return after
 
 @debris_routes.route('/', methods=['GET'])
+@cached_response
 def get_debris_data():
-    """Get paginated debris data with optional filters"""
+    """
+    Get paginated debris data with optional filters
+
+    Supports equality filters on object_type, rcs_size and country_code,
+    range filters <name>_min / <name>_max on periapsis, apoapsis, inclination,
+    period and altitude, and a `filter` expression over any column, e.g.
+    `OBJECT_TYPE IN (DEBRIS, 'ROCKET BODY') AND PERIAPSIS < 600`. `fields` restricts the response to a comma-separated
+    list of columns, and `shape=columnar` returns one array per field instead
+    of one object per row. Pages by `page`/`limit` by default. Passing `cursor` (empty for the first
+    page) switches to keyset pagination ordered by NORAD_CAT_ID; each response
+    then carries the `next_cursor` to request the following page with.
+    """
     # Get query parameters
     page = request.args.get('page', default=1, type=int)
     limit = request.args.get('limit', default=100, type=int)
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
     object_type = request.args.get('object_type', default=None, type=str)
     rcs_size = request.args.get('rcs_size', default=None, type=str)
     country_code = request.args.get('country_code', default=None, type=str)
+    shape = request.args.get('shape', default='records', type=str)
+    if shape not in ('records', 'columnar'):
+        return json_response({'error': f'Unsupported shape: {shape}'}), 400
     
     # Load data
-    df, error = load_data()
-    if df is None:
-        return jsonify({'error': error or 'Failed to load data'}), 500
-    
-    # Apply filters
-    if object_type:
-        df = df[df['OBJECT_TYPE'] == object_type]
-    if rcs_size:
-        df = df[df['RCS_SIZE'] == rcs_size]
-    if country_code:
-        df = df[df['COUNTRY_CODE'] == country_code]
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
+    df = snapshot.df
+    
+    # Resolve the field projection
+    try:
+        columns = requested_columns(df)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    
+    try:
+        # Apply filters through the inverted and range indexes
+        row_ids = snapshot.index.lookup({
+            'OBJECT_TYPE': object_type,
+            'RCS_SIZE': rcs_size,
+            'COUNTRY_CODE': country_code
+        }, range_filters())
+        
+        # Narrow further by the filter expression
+        row_ids = apply_filter(snapshot, request.args.get('filter'), row_ids)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    total_records = len(df) if row_ids is None else len(row_ids)
+    
+    # Keyset pagination
+    if 'cursor' in request.args:
+        try:
+            after = decode_cursor(request.args.get('cursor'))
+        except ValueError as e:
+            return json_response({'error': str(e)}), 400
+        
+        page_rows, has_more = snapshot.index.page_after(after, limit, row_ids)
+        page_df = select_rows(df, page_rows, columns)
+        next_cursor = None
+        if has_more and len(page_rows) > 0:
+            next_cursor = encode_cursor(snapshot.index.norad_ids[page_rows[-1]].item())
+        
+        return json_response({
+            'data': serialize_rows(page_df, shape),
+            'pagination': {
+                'limit': limit,
+                'total_records': total_records,
+                'next_cursor': next_cursor
+            }
+        })
     
     # Calculate pagination
-    total_records = len(df)
     total_pages = (total_records + limit - 1) // limit
     start_idx = (page - 1) * limit
     end_idx = min(start_idx + limit, total_records)
     
     # Get paginated data
-    paginated_data = df.iloc[start_idx:end_idx].to_dict(orient='records')
+    if row_ids is None:
+        page_df = select_rows(df, slice(start_idx, end_idx), columns)
+    else:
+        page_df = select_rows(df, row_ids[start_idx:end_idx], columns)
+    paginated_data = serialize_rows(page_df, shape)
     
-    return jsonify({
+    return json_response({
         'data': paginated_data,
         'pagination': {
             'page': page,
@@ -91,76 +222,303 @@ def get_debris_data():
         }
     })
 
+def cube_filters():
+    """Read the optional object_type / rcs_size / country_code filters"""
+    return {
+        'OBJECT_TYPE': request.args.get('object_type', default=None, type=str),
+        'RCS_SIZE': request.args.get('rcs_size', default=None, type=str),
+        'COUNTRY_CODE': request.args.get('country_code', default=None, type=str)
+    }
+
 @debris_routes.route('/stats', methods=['GET'])
+@cached_response
 def get_debris_stats():
-    """Get statistical information about the debris data"""
-    df, error = load_data()
-    if df is None:
-        return jsonify({'error': error or 'Failed to load data'}), 500
+    """Get statistical information about the debris data, optionally filtered"""
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
     
-    # Calculate statistics
+    # Calculate statistics from the aggregate cube
+    cube = snapshot.cube
+    filters = cube_filters()
     stats = {
-        'total_objects': len(df),
-        'object_type_counts': df['OBJECT_TYPE'].value_counts().to_dict(),
-        'rcs_size_counts': df['RCS_SIZE'].value_counts().to_dict(),
-        'country_code_counts': df['COUNTRY_CODE'].value_counts().to_dict(),
-        'launch_date_range': {
-            'min': df['LAUNCH_DATE'].min() if 'LAUNCH_DATE' in df.columns else None,
-            'max': df['LAUNCH_DATE'].max() if 'LAUNCH_DATE' in df.columns else None
-        },
+        'total_objects': cube.total(filters),
+        'object_type_counts': dict(cube.counts_by('OBJECT_TYPE', filters)),
+        'rcs_size_counts': dict(cube.counts_by('RCS_SIZE', filters)),
+        'country_code_counts': dict(cube.counts_by('COUNTRY_CODE', filters)),
+        'launch_date_range': cube.launch_date_range(filters),
         'orbital_parameters': {
-            'eccentricity': {
-                'min': df['ECCENTRICITY'].min(),
-                'max': df['ECCENTRICITY'].max(),
-                'mean': df['ECCENTRICITY'].mean()
-            },
-            'inclination': {
-                'min': df['INCLINATION'].min(),
-                'max': df['INCLINATION'].max(),
-                'mean': df['INCLINATION'].mean()
-            },
-            'period': {
-                'min': df['PERIOD'].min(),
-                'max': df['PERIOD'].max(),
-                'mean': df['PERIOD'].mean()
-            }
+            'eccentricity': cube.metric_summary('ECCENTRICITY', filters),
+            'inclination': cube.metric_summary('INCLINATION', filters),
+            'period': cube.metric_summary('PERIOD', filters)
         }
     }
     
-    return jsonify(stats)
+    return json_response(stats)
 
 @debris_routes.route('/countries', methods=['GET'])
+@cached_response
 def get_countries():
     """Get list of countries with debris counts"""
-    df, error = load_data()
-    if df is None:
-        return jsonify({'error': error or 'Failed to load data'}), 500
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
     
-    country_counts = df['COUNTRY_CODE'].value_counts().to_dict()
-    countries = [{'code': code, 'count': count} for code, count in country_counts.items()]
+    country_counts = snapshot.cube.counts_by('COUNTRY_CODE', cube_filters())
+    countries = [{'code': code, 'count': count} for code, count in country_counts]
     
-    return jsonify(countries)
+    return json_response(countries)
 
 @debris_routes.route('/types', methods=['GET'])
+@cached_response
 def get_object_types():
     """Get list of object types with counts"""
-    df, error = load_data()
-    if df is None:
-        return jsonify({'error': error or 'Failed to load data'}), 500
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
     
-    type_counts = df['OBJECT_TYPE'].value_counts().to_dict()
-    types = [{'type': obj_type, 'count': count} for obj_type, count in type_counts.items()]
+    type_counts = snapshot.cube.counts_by('OBJECT_TYPE', cube_filters())
+    types = [{'type': obj_type, 'count': count} for obj_type, count in type_counts]
     
-    return jsonify(types)
+    return json_response(types)
 
 @debris_routes.route('/sizes', methods=['GET'])
+@cached_response
 def get_rcs_sizes():
     """Get list of RCS sizes with counts"""
-    df, error = load_data()
-    if df is None:
-        return jsonify({'error': error or 'Failed to load data'}), 500
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
+    
+    size_counts = snapshot.cube.counts_by('RCS_SIZE', cube_filters())
+    sizes = [{'size': size, 'count': count} for size, count in size_counts]
+    
+    return json_response(sizes) 
+
+def iter_chunks(df, row_ids):
+    """Yield the selected rows of a snapshot frame in EXPORT_CHUNK_ROWS slices"""
+    total = len(df) if row_ids is None else len(row_ids)
+    for start in range(0, total, EXPORT_CHUNK_ROWS):
+        end = start + EXPORT_CHUNK_ROWS
+        if row_ids is None:
+            yield df.iloc[start:end]
+        else:
+            yield df.iloc[row_ids[start:end]]
+
+def stream_ndjson(df, row_ids):
+    """Stream rows as newline-delimited JSON"""
+    for chunk in iter_chunks(df, row_ids):
+        yield chunk.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+
+def stream_csv(df, row_ids):
+    """Stream rows as CSV with a single header line"""
+    header = True
+    for chunk in iter_chunks(df, row_ids):
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+
+def stream_arrow(df, row_ids):
+    """Stream rows as an Arrow IPC stream, one record batch per chunk"""
+    # Derive the schema from a sample; all-missing text columns infer as null
+    schema = pa.Schema.from_pandas(df.iloc[:EXPORT_CHUNK_ROWS], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    for chunk in iter_chunks(df, row_ids):
+        writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+@debris_routes.route('/search', methods=['GET'])
+@cached_response
+def search_debris_objects():
+    """
+    Search objects by name, for lookups and type-ahead
+
+    `q` is matched against OBJECT_NAME ignoring case and extra spaces.
+    `mode=prefix` returns names starting with `q` alphabetically,
+    `mode=fuzzy` returns names ranked by trigram similarity, and the default
+    `mode=auto` lists prefix matches first and fills up with fuzzy ones.
+    Returns at most `limit` objects (default 10).
+    """
+    query = normalize_name(request.args.get('q', default='', type=str))
+    mode = request.args.get('mode', default='auto', type=str)
+    limit = request.args.get('limit', default=10, type=int)
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    if not query:
+        return json_response({'error': 'Missing search query'}), 400
+    if mode not in ('auto', 'prefix', 'fuzzy'):
+        return json_response({'error': f'Unsupported search mode: {mode}'}), 400
+    
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
+    search = snapshot.name_search
+    
+    rows, matches, scores = [], [], []
+    if mode in ('auto', 'prefix'):
+        prefix_rows, _ = search.prefix(query, limit)
+        rows.extend(prefix_rows.tolist())
+        matches.extend(['prefix'] * len(prefix_rows))
+        scores.extend([1.0] * len(prefix_rows))
+    
+    if mode == 'fuzzy' or (mode == 'auto' and len(rows) < limit):
+        # Ask for extra rows in case some were already found by prefix
+        fuzzy_rows, _, similarity = search.fuzzy(query, limit + len(rows))
+        seen = set(rows)
+        for row, score in zip(fuzzy_rows.tolist(), similarity.tolist()):
+            if len(rows) >= limit:
+                break
+            if row not in seen:
+                rows.append(row)
+                matches.append('fuzzy')
+                scores.append(round(score, 4))
+    
+    results = snapshot.df.iloc[rows][SEARCH_FIELDS].to_dict(orient='records')
+    for result, match, score in zip(results, matches, scores):
+        result['match'] = match
+        result['score'] = score
+    
+    return json_response({
+        'query': query,
+        'count': len(results),
+        'results': results
+    })
+
+def echo_id(key):
+    """An id as the client sent it, as a string if it is an integer too large to encode"""
+    if isinstance(key, int) and not INT64.min <= key <= INT64.max:
+        return str(key)
+    return key
+
+@debris_routes.route('/bulk', methods=['GET', 'POST'])
+@cached_response
+def get_debris_objects():
+    """
+    Look up many objects in one round trip
+
+    Accepts a JSON body {"ids": [...]} on POST or a comma-separated `ids`
+    query parameter on GET. Each id may be a NORAD catalog number or an
+    OBJECT_ID. Records are returned in request order.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        ids = data.get('ids') if isinstance(data, dict) else None
+    else:
+        ids = [i for i in request.args.get('ids', default='', type=str).split(',') if i]
+    
+    if not isinstance(ids, list) or not ids:
+        return json_response({'error': 'Missing required field: ids'}), 400
+    if len(ids) > MAX_PAGE_LIMIT:
+        return json_response({'error': f'At most {MAX_PAGE_LIMIT} ids can be requested at once'}), 400
+    
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
+    
+    rows = snapshot.index.find_rows(ids)
+    found = rows >= 0
+    
+    return json_response({
+        'data': snapshot.df.iloc[rows[found]].to_dict(orient='records'),
+        'not_found': [echo_id(key) for key, hit in zip(ids, found) if not hit]
+    })
+
+@debris_routes.route('/<object_id>', methods=['GET'])
+@cached_response
+def get_debris_object(object_id):
+    """Get a single object by NORAD catalog number or OBJECT_ID"""
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
+    
+    row = snapshot.index.find_rows([object_id])[0]
+    if row < 0:
+        return json_response({'error': f'Object not found: {object_id}'}), 404
+    
+    return json_response(snapshot.df.iloc[[row]].to_dict(orient='records')[0])
+
+@debris_routes.route('/export', methods=['GET'])
+def export_debris_data():
+    """
+    Stream the whole (optionally filtered) catalog in one response
+
+    Rows are written in fixed-size chunks from a single snapshot, so memory
+    stays flat regardless of catalog size and the body is sent with chunked
+    transfer encoding. Supports `format` = ndjson (default), csv or arrow,
+    and the same filters as the list endpoint, including `filter`.
+    """
+    export_format = request.args.get('format', default='ndjson', type=str)
+    if export_format not in EXPORT_FORMATS:
+        return json_response({'error': f'Unsupported export format: {export_format}'}), 400
+    if export_format == 'arrow' and pa is None:
+        return json_response({'error': 'Arrow export requires pyarrow to be installed'}), 400
     
-    size_counts = df['RCS_SIZE'].value_counts().to_dict()
-    sizes = [{'size': size, 'count': count} for size, count in size_counts.items()]
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
+    
+    try:
+        row_ids = snapshot.index.lookup(cube_filters(), range_filters())
+        row_ids = apply_filter(snapshot, request.args.get('filter'), row_ids)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    
+    streams = {'ndjson': stream_ndjson, 'csv': stream_csv, 'arrow': stream_arrow}
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        streams[export_format](snapshot.df, row_ids),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename=space_debris.{extension}',
+            'X-Catalog-Version': str(snapshot.version)
+        }
+    )
+
+@debris_routes.route('/version', methods=['GET'])
+def get_catalog_version():
+    """Get the version of the catalog snapshot currently served, for cache keys"""
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': error or 'Failed to load data'}), 500
     
-    return jsonify(sizes) 
\ No newline at end of file
+    return json_response({
+        'version': snapshot.version,
+        'rows': len(snapshot.df),
+        'loaded_at': snapshot.loaded_at
+    })
+
+@debris_routes.route('/ingest', methods=['POST'])
+@token_required
+def ingest_debris_data(current_user):
+    """
+    Apply a delta of new, updated and decayed objects to the catalog
+
+    Expects JSON with an `upserts` list of catalog records (each with at least
+    NORAD_CAT_ID and EPOCH) and/or a `decays` list of NORAD ids. The delta is
+    journaled next to the catalog CSV so every worker applies it, and the
+    response reports the new snapshot version.
+    """
+    try:
+        delta = parse_delta(request.get_json(silent=True))
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    
+    try:
+        snapshot, summary = catalog_store.ingest(delta)
+    except Exception as e:
+        print(f"Error ingesting catalog delta: {e}")
+        return json_response({'error': f'Error ingesting data: {str(e)}'}), 500
+    
+    return json_response({
+        'version': snapshot.version,
+        'rows': len(snapshot.df),
+        'summary': summary,
+        'ingested_by': current_user
+    })
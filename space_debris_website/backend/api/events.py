@@ -1,6 +1,8 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 from datetime import datetime, timedelta
 
+from utils.json_response import json_response
+
 events_routes = Blueprint('events', __name__)
 
 @events_routes.route('/', methods=['GET'])
@@ -38,7 +40,7 @@ def get_events():
     # Filter by date
     filtered_events = [e for e in events if start_date <= e['date'] <= end_date]
     
-    return jsonify({'events': filtered_events})
+    return json_response({'events': filtered_events})
 
 @events_routes.route('/types', methods=['GET'])
 def get_event_types():
@@ -50,4 +52,4 @@ def get_event_types():
         {'id': 'breakup', 'name': 'Breakup Event', 'description': 'Satellite or debris breakup events'},
         {'id': 'historical', 'name': 'Historical Event', 'description': 'Significant historical events'}
     ]
-    return jsonify({'event_types': event_types}) 
\ No newline at end of file
+    return json_response({'event_types': event_types}) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request
 import os
 import traceback
 from dotenv import load_dotenv
@@ -7,6 +7,8 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
 
+from utils.json_response import json_response
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -94,7 +96,7 @@ def subscribe():
         data = request.get_json()
         if not data:
             logger.error("No JSON data received in request")
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'No data received'
             }), 400
@@ -104,7 +106,7 @@ def subscribe():
         
         if not email:
             logger.error("No email address provided")
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'Email address is required'
             }), 400
@@ -129,13 +131,13 @@ The Space Debris Monitoring Team
         
         if success:
             logger.info(f"Successfully subscribed {email} to newsletter")
-            return jsonify({
+            return json_response({
                 'status': 'success',
                 'message': 'Successfully subscribed to newsletter!'
             })
         else:
             logger.error(f"Failed to send confirmation email: {message}")
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': message
             }), 500
@@ -144,7 +146,7 @@ The Space Debris Monitoring Team
         error_details = traceback.format_exc()
         logger.error(f"Error in subscribe endpoint: {str(e)}")
         logger.error(f"Error details: {error_details}")
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': str(e)
         }), 500 
\ No newline at end of file
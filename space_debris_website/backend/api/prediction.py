@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 import pandas as pd
 import numpy as np
 import joblib
@@ -12,14 +12,65 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from models.rcs_predictor import RCSPredictor
 from models.decay_predictor import DecayPredictor
 from models.risk_predictor import RiskPredictor
+from utils.compiled_forest import compiled_forest
+from utils.json_response import json_response
+from utils.micro_batch import MicroBatcher
+from utils.model_loader import RETRY_AFTER_SECONDS, ModelLoader
 
 # Create blueprint
 prediction_routes = Blueprint('prediction_routes', __name__)
 
-# Initialize the predictors
-rcs_predictor = RCSPredictor()
-decay_predictor = DecayPredictor()
-risk_predictor = RiskPredictor()
+# Coalesce concurrent single-object predictions into one forest evaluation.
+# The flush window and batch size come from PREDICTION_BATCH_WINDOW_MS and
+# PREDICTION_BATCH_MAX_ROWS (see utils.micro_batch)
+MICRO_BATCHING = os.environ.get('PREDICTION_MICRO_BATCHING', '').lower() in ('1', 'true', 'yes')
+
+def predictor_factory(predictor_class):
+    """Callable that loads (or trains) a predictor and readies it for requests"""
+    def load():
+        predictor = predictor_class()
+        if MICRO_BATCHING:
+            # Failures reach predict() as exceptions, so fallbacks are never cached
+            predictor.batcher = MicroBatcher(predictor._evaluate)
+        # Compile the forest now rather than on the first request
+        compiled_forest(predictor)
+        return predictor
+    return load
+
+# The predictors load (or train) in the background, so importing this module
+# does not hold up the rest of the app
+model_loader = ModelLoader({
+    'rcs': predictor_factory(RCSPredictor),
+    'decay': predictor_factory(DecayPredictor),
+    'risk': predictor_factory(RiskPredictor)
+})
+
+@prediction_routes.record_once
+def start_model_loading(state):
+    """Start loading the models as soon as the blueprint is registered"""
+    model_loader.start()
+
+def loaded_predictor(name):
+    """
+    The named predictor, once it has loaded
+    
+    Returns:
+        tuple: (predictor, None) or (None, 503 response while it loads or if it failed)
+    """
+    predictor = model_loader.get(name)
+    if predictor is not None:
+        return predictor, None
+    
+    status = model_loader.status()[name]
+    if status['state'] == 'failed':
+        return None, (json_response({
+            'error': f'The {name} model failed to load: {status["error"]}',
+            'state': status['state']
+        }), 503)
+    return None, (json_response({
+        'error': f'The {name} model is still loading, retry in a few seconds',
+        'state': status['state']
+    }), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)})
 
 # Define required fields for each model
 rcs_fields = [
@@ -34,16 +85,106 @@ decay_risk_fields = [
     'MEAN_VELOCITY', 'AGE', 'OBJECT_TYPE', 'ORBIT_CLASS'
 ]
 
+# Most objects accepted by one batch request
+MAX_BATCH_SIZE = int(os.environ.get('PREDICTION_MAX_BATCH', 50000))
+
+def read_batch(fields):
+    """
+    Read the feature matrix of a batch prediction request
+
+    The body is a list of objects, {"objects": [...]}, or columnar
+    {"columns": {"FIELD": [values], ...}}. A row with a missing or
+    non-numeric field is reported in its place instead of failing the batch.
+
+    Returns:
+        tuple: ((X of the valid rows, their indices, {index: error}, row count) or None,
+                error response or None)
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and 'columns' in data:
+        columns = data['columns']
+        if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+            return None, (json_response({'error': '"columns" must map field names to lists'}), 400)
+        missing = [field for field in fields if field not in columns]
+        if missing:
+            return None, (json_response({'error': f'Missing required field: {missing[0]}'}), 400)
+        lengths = {len(columns[field]) for field in fields}
+        if len(lengths) > 1:
+            return None, (json_response({'error': 'All columns must have the same length'}), 400)
+        count = lengths.pop()
+        values = {field: columns[field] for field in fields}
+        present = {field: np.ones(count, dtype=bool) for field in fields}
+        malformed = np.zeros(count, dtype=bool)
+    else:
+        objects = data.get('objects') if isinstance(data, dict) else data
+        if not isinstance(objects, list):
+            return None, (json_response({'error': 'Expected a list of objects or {"columns": {...}}'}), 400)
+        count = len(objects)
+        malformed = np.array([not isinstance(obj, dict) for obj in objects], dtype=bool)
+        objects = [obj if isinstance(obj, dict) else {} for obj in objects]
+        values = {field: [obj.get(field) for obj in objects] for field in fields}
+        present = {field: np.array([field in obj for obj in objects], dtype=bool) for field in fields}
+    
+    if count == 0:
+        return None, (json_response({'error': 'No objects to score'}), 400)
+    if count > MAX_BATCH_SIZE:
+        return None, (json_response({'error': f'At most {MAX_BATCH_SIZE} objects per batch'}), 400)
+    
+    # Parse one column at a time; anything non-numeric becomes NaN
+    X = np.empty((count, len(fields)))
+    errors = {int(i): 'Each object must be a JSON object' for i in np.flatnonzero(malformed)}
+    bad = malformed.copy()
+    for j, field in enumerate(fields):
+        column = pd.to_numeric(pd.Series(values[field], dtype=object), errors='coerce')
+        X[:, j] = column.to_numpy(dtype=float)
+        for i in np.flatnonzero(~bad & ~present[field]):
+            errors[int(i)] = f'Missing required field: {field}'
+        bad |= ~present[field]
+        for i in np.flatnonzero(~bad & ~np.isfinite(X[:, j])):
+            errors[int(i)] = f'Invalid value for field: {field}'
+        bad |= ~np.isfinite(X[:, j])
+    
+    valid = np.flatnonzero(~bad)
+    return (X[valid], valid, errors, count), None
+
+def batch_response(batch, score):
+    """
+    Score the valid rows of a batch and lay the results out in request order,
+    with errors in place of invalid rows
+
+    Args:
+        batch (tuple): Batch from read_batch
+        score (callable): Maps the feature matrix to one result dict per row
+    """
+    X, valid, errors, count = batch
+    results = score(X) if len(valid) else []
+    rows = [None] * count
+    for i, result in zip(valid.tolist(), results):
+        rows[i] = result
+    for i, error in errors.items():
+        rows[i] = {'error': error}
+    
+    return json_response({
+        'count': count,
+        'scored': len(valid),
+        'failed': len(errors),
+        'results': rows
+    })
+
 @prediction_routes.route('/rcs', methods=['POST'])
 def predict_rcs():
     """Predict RCS size based on orbital parameters"""
     try:
+        rcs_predictor, error = loaded_predictor('rcs')
+        if error:
+            return error
+        
         data = request.get_json()
         
         # Validate required fields
         for field in rcs_fields:
             if field not in data:
-                return jsonify({
+                return json_response({
                     'error': f'Missing required field: {field}'
                 }), 400
         
@@ -60,14 +201,14 @@ def predict_rcs():
             {"class": "LARGE", "probability": float(probabilities[2])}
         ]
         
-        return jsonify({
+        return json_response({
             'predicted_class': rcs_class,
             'class_probabilities': rcs_class_probabilities,
             'input_features': features
         })
     
     except Exception as e:
-        return jsonify({
+        return json_response({
             'error': f'RCS prediction error: {str(e)}'
         }), 500
 
@@ -75,26 +216,30 @@ def predict_rcs():
 def predict_decay():
     """Predict decay probability based on orbital parameters"""
     try:
+        decay_predictor, error = loaded_predictor('decay')
+        if error:
+            return error
+        
         data = request.get_json()
         
         # Validate required fields
         for field in decay_risk_fields:
             if field not in data:
-                return jsonify({
+                return json_response({
                     'error': f'Missing required field: {field}'
                 }), 400
         
         # Make prediction
         decay_prob, probabilities = decay_predictor.predict(data)
         
-        return jsonify({
+        return json_response({
             'decay_probability': decay_prob,
             'likely_to_decay': decay_prob > 0.5,
             'input_features': data
         })
     
     except Exception as e:
-        return jsonify({
+        return json_response({
             'error': f'Decay prediction error: {str(e)}'
         }), 500
 
@@ -102,19 +247,23 @@ def predict_decay():
 def predict_risk():
     """Predict collision risk based on orbital parameters"""
     try:
+        risk_predictor, error = loaded_predictor('risk')
+        if error:
+            return error
+        
         data = request.get_json()
         
         # Validate required fields
         for field in decay_risk_fields:
             if field not in data:
-                return jsonify({
+                return json_response({
                     'error': f'Missing required field: {field}'
                 }), 400
         
         # Make prediction
         risk_level, probabilities = risk_predictor.predict(data)
         
-        return jsonify({
+        return json_response({
             'risk_level': risk_level,
             'risk_probabilities': {
                 'low': float(probabilities[0]),
@@ -125,39 +274,143 @@ def predict_risk():
         })
     
     except Exception as e:
-        return jsonify({
+        return json_response({
+            'error': f'Risk prediction error: {str(e)}'
+        }), 500
+
+@prediction_routes.route('/rcs/batch', methods=['POST'])
+def predict_rcs_batch():
+    """Predict RCS sizes for many objects in one forest evaluation"""
+    rcs_predictor, error = loaded_predictor('rcs')
+    if error:
+        return error
+    
+    batch, error = read_batch(rcs_fields)
+    if error:
+        return error
+    
+    def score(X):
+        rcs_classes, probabilities = rcs_predictor.predict_batch(X)
+        return [
+            {
+                'predicted_class': rcs_class,
+                'class_probabilities': [
+                    {"class": "SMALL", "probability": p[0]},
+                    {"class": "MEDIUM", "probability": p[1]},
+                    {"class": "LARGE", "probability": p[2]}
+                ]
+            }
+            for rcs_class, p in zip(rcs_classes, probabilities.tolist())
+        ]
+    
+    try:
+        return batch_response(batch, score)
+    except Exception as e:
+        return json_response({
+            'error': f'RCS prediction error: {str(e)}'
+        }), 500
+
+@prediction_routes.route('/decay/batch', methods=['POST'])
+def predict_decay_batch():
+    """Predict decay probabilities for many objects in one forest evaluation"""
+    decay_predictor, error = loaded_predictor('decay')
+    if error:
+        return error
+    
+    batch, error = read_batch(decay_risk_fields)
+    if error:
+        return error
+    
+    def score(X):
+        decay_probs, probabilities = decay_predictor.predict_batch(X)
+        return [
+            {
+                'decay_probability': decay_prob,
+                'likely_to_decay': decay_prob > 0.5
+            }
+            for decay_prob in decay_probs.tolist()
+        ]
+    
+    try:
+        return batch_response(batch, score)
+    except Exception as e:
+        return json_response({
+            'error': f'Decay prediction error: {str(e)}'
+        }), 500
+
+@prediction_routes.route('/risk/batch', methods=['POST'])
+def predict_risk_batch():
+    """Predict collision risk levels for many objects in one forest evaluation"""
+    risk_predictor, error = loaded_predictor('risk')
+    if error:
+        return error
+    
+    batch, error = read_batch(decay_risk_fields)
+    if error:
+        return error
+    
+    def score(X):
+        risk_levels, probabilities = risk_predictor.predict_batch(X)
+        return [
+            {
+                'risk_level': risk_level,
+                'risk_probabilities': {
+                    'low': p[0],
+                    'medium': p[1],
+                    'high': p[2]
+                }
+            }
+            for risk_level, p in zip(risk_levels, probabilities.tolist())
+        ]
+    
+    try:
+        return batch_response(batch, score)
+    except Exception as e:
+        return json_response({
             'error': f'Risk prediction error: {str(e)}'
         }), 500
 
 @prediction_routes.route('/model-info', methods=['GET'])
 def get_model_info():
     """Get information about all prediction models"""
+    predictors = {}
+    for name in ('rcs', 'decay', 'risk'):
+        predictors[name], error = loaded_predictor(name)
+        if error:
+            return error
+    rcs_predictor = predictors['rcs']
+    decay_predictor = predictors['decay']
+    risk_predictor = predictors['risk']
+    
     try:
-        return jsonify({
+        return json_response({
             'rcs_model': {
                 'model_type': rcs_predictor.model_type,
                 'accuracy': rcs_predictor.accuracy,
                 'training_samples': 5000,
                 'last_updated': rcs_predictor.last_trained,
                 'feature_importance': rcs_predictor.feature_importance,
-                'required_fields': rcs_fields
+                'required_fields': rcs_fields,
+                'prediction_cache': rcs_predictor.cache.stats()
             },
             'decay_model': {
                 'model_type': decay_predictor.model_type,
                 'accuracy': decay_predictor.accuracy,
                 'last_updated': decay_predictor.last_trained,
                 'feature_importance': decay_predictor.feature_importance,
-                'required_fields': decay_risk_fields
+                'required_fields': decay_risk_fields,
+                'prediction_cache': decay_predictor.cache.stats()
             },
             'risk_model': {
                 'model_type': risk_predictor.model_type,
                 'accuracy': risk_predictor.accuracy,
                 'last_updated': risk_predictor.last_trained,
                 'feature_importance': risk_predictor.feature_importance,
-                'required_fields': decay_risk_fields
+                'required_fields': decay_risk_fields,
+                'prediction_cache': risk_predictor.cache.stats()
             }
         })
     except Exception as e:
-        return jsonify({
+        return json_response({
             'error': f'Error getting model info: {str(e)}'
         }), 500 
\ No newline at end of file
@@ -1,8 +1,10 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from utils.json_response import json_response
+
 real_time_routes = Blueprint('real_time', __name__)
 
 @real_time_routes.route('/collision-risk', methods=['GET'])
@@ -19,7 +21,7 @@ def get_collision_risk():
             {'primary_object': 'ISS', 'secondary_object': 'COSMOS 1408 Debris', 'time_to_closest_approach': '2h 15m', 'miss_distance_km': 12.5}
         ]
     }
-    return jsonify(risk_data)
+    return json_response(risk_data)
 
 @real_time_routes.route('/trajectory', methods=['GET'])
 def get_trajectory():
@@ -27,7 +29,7 @@ def get_trajectory():
     object_id = request.args.get('norad_id', '')
     
     if not object_id:
-        return jsonify({'error': 'Missing required parameter: norad_id'}), 400
+        return json_response({'error': 'Missing required parameter: norad_id'}), 400
     
     # Sample trajectory data - would use actual prediction model in production
     trajectory_data = {
@@ -40,7 +42,7 @@ def get_trajectory():
             # More points would be included in real implementation
         ]
     }
-    return jsonify(trajectory_data)
+    return json_response(trajectory_data)
 
 @real_time_routes.route('/space-weather', methods=['GET'])
 def get_space_weather():
@@ -56,7 +58,7 @@ def get_space_weather():
         },
         'impact_on_debris': 'Solar activity might cause slight atmospheric expansion, potentially accelerating decay of objects below 400km altitude'
     }
-    return jsonify(weather_data)
+    return json_response(weather_data)
 
 @real_time_routes.route('/alerts', methods=['GET'])
 def get_alerts():
@@ -77,4 +79,4 @@ def get_alerts():
             'time': '2023-05-01T14:15:00Z'
         }
     ]
-    return jsonify({'alerts': alerts}) 
\ No newline at end of file
+    return json_response({'alerts': alerts}) 
\ No newline at end of file
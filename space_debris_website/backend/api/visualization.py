@@ -1,145 +1,227 @@
-from flask import Blueprint, jsonify, request
-import pandas as pd
+from flask import Blueprint, request
 import numpy as np
-import os
 import json
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.utils
 
+from utils.aggregates import AggregateCube
+from utils.catalog import catalog_store
+from utils.density_tiles import DENSITY_VIEWS, MAX_ZOOM, TILE_SIZE, DensityTiles
+from utils.downsample import downsample, viewport_mask
+from utils.filter_expr import apply_filter
+from utils.grouped_traces import RowGroups, scatter_traces
+from utils.histograms import GroupedValues, histogram_edges
+from utils.json_response import json_response, typed_array
+from utils.response_cache import cached_response
+
 # Create blueprint
 visualization_routes = Blueprint('visualization_routes', __name__)
 
-# Path to the data file
-# Try multiple possible paths to find the data file
-DATA_PATHS = [
-    # Original path
-    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'space_decay.csv'),
-    # Alternative path relative to backend
-    os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'space_decay.csv'),
-    # Root level path
-    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'space_decay.csv'),
-    # Absolute path to project root + data
-    os.path.join(os.path.abspath(os.sep), 'Users', 'vishe', 'OneDrive', 'Desktop', 'project this', 'space_decay.csv'),
-    # Absolute path to project data directory
-    os.path.join(os.path.abspath(os.sep), 'Users', 'vishe', 'OneDrive', 'Desktop', 'project this', 'space_debris_website', 'data', 'space_decay.csv')
-]
+# Categorical columns shown on hover, sent as codes in columnar scatter payloads
+HOVER_COLUMNS = ('OBJECT_TYPE', 'COUNTRY_CODE')
+
+# Per-point hover text of plain scatter traces, filled with the hover
+# columns, x and y
+ORBIT_TEXT = "Object Type: {}<br>Country: {}<br>Period: {:.2f} hours<br>Inclination: {:.2f}°"
+ECC_PERIOD_TEXT = "Object Type: {}<br>Country: {}<br>Period: {:.2f} hours<br>Eccentricity: {:.4f}"
+INC_ECC_TEXT = "Object Type: {}<br>Country: {}<br>Eccentricity: {:.4f}<br>Inclination: {:.2f}°"
+
+# Hover templates for columnar traces; customdata is built by the client
+# from the dictionary-encoded HOVER_COLUMNS
+ORBIT_HOVER = "Object Type: %{customdata[0]}<br>Country: %{customdata[1]}<br>Period: %{x:.2f} hours<br>Inclination: %{y:.2f}°<extra></extra>"
+ECC_PERIOD_HOVER = "Object Type: %{customdata[0]}<br>Country: %{customdata[1]}<br>Period: %{x:.2f} hours<br>Eccentricity: %{y:.4f}<extra></extra>"
+INC_ECC_HOVER = "Object Type: %{customdata[0]}<br>Country: %{customdata[1]}<br>Eccentricity: %{x:.4f}<br>Inclination: %{y:.2f}°<extra></extra>"
 
 def load_data():
-    """Load the space debris data from CSV file"""
-    for path in DATA_PATHS:
-        try:
-            print(f"Trying to load data from {path}")
-            if os.path.exists(path):
-                print(f"Found data file at: {path}")
-                df = pd.read_csv(path)
-                if df is not None and len(df) > 0:
-                    print(f"Successfully loaded {len(df)} rows of data")
-                    
-                    # Add computed columns that might be needed
-                    try:
-                        # Calculate altitude from semimajor axis
-                        df['ALTITUDE_KM'] = df['SEMIMAJOR_AXIS'] - 6371  # Earth radius in km
-                        
-                        # Calculate orbital period in hours
-                        df['PERIOD_HOURS'] = df['PERIOD'] / 60
-                        
-                        print("Successfully added computed columns")
-                    except Exception as e:
-                        print(f"Warning: Error adding computed columns: {e}")
-                    
-                    return df
-                else:
-                    print(f"Warning: Data file at {path} is empty")
-            else:
-                print(f"Data file not found at {path}")
-        except Exception as e:
-            print(f"Error loading data from {path}: {e}")
-            continue
+    """
+    Get the space debris data, narrowed by the optional `filter` expression
+
+    Returns:
+        tuple: (DataFrame or None, error response or None)
+    """
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return None, (json_response({'error': 'Failed to load data'}), 500)
+    
+    try:
+        rows = apply_filter(snapshot, request.args.get('filter'))
+    except ValueError as e:
+        return None, (json_response({'error': str(e)}), 400)
     
-    # If we get here, we couldn't find the data file
-    print("Failed to load data from any of the possible paths")
-    print("Searched paths:")
-    for path in DATA_PATHS:
-        print(f"  - {path}")
-    return None
+    if rows is None:
+        return snapshot.df, None
+    return snapshot.df.iloc[rows], None
+
+def load_cube():
+    """
+    Get the aggregate cube, built over the filtered rows when `filter` is given
+
+    Returns:
+        tuple: (AggregateCube or None, error response or None)
+    """
+    if not request.args.get('filter'):
+        snapshot, error = catalog_store.load_snapshot()
+        if snapshot is None:
+            return None, (json_response({'error': 'Failed to load data'}), 500)
+        return snapshot.cube, None
+    
+    df, error = load_data()
+    if df is None:
+        return None, error
+    return AggregateCube(df), None
+
+def read_sampling():
+    """
+    Read the optional scatter downsampling parameters
+
+    `max_points` caps how many points are returned, and `x_min`, `x_max`,
+    `y_min` and `y_max` restrict them to a viewport, so a zoomed-in plot can
+    fetch a re-sampled subset of just the visible region.
+
+    Returns:
+        tuple: (parameters dict or None when none were given, error response or None)
+    """
+    max_points = request.args.get('max_points', default=None, type=int)
+    if max_points is not None and max_points < 1:
+        return None, (json_response({'error': 'max_points must be at least 1'}), 400)
+    
+    x_range = (request.args.get('x_min', default=None, type=float), request.args.get('x_max', default=None, type=float))
+    y_range = (request.args.get('y_min', default=None, type=float), request.args.get('y_max', default=None, type=float))
+    if max_points is None and x_range == (None, None) and y_range == (None, None):
+        return None, None
+    
+    return {'max_points': max_points, 'x_range': x_range, 'y_range': y_range}, None
+
+def sample_scatter(df, x_column, y_column, sampling):
+    """
+    Narrow scatter rows to the viewport and the point budget
+
+    Sampling is stratified by RCS_SIZE, so every trace keeps its shape.
+
+    Returns:
+        tuple: (DataFrame of the kept rows, sampling summary or None)
+    """
+    if sampling is None:
+        return df, None
+    
+    # Rows without an RCS size are not plotted, so they get no share of the budget
+    df = df[df['RCS_SIZE'].notna()]
+    x = df[x_column].to_numpy(dtype=float)
+    y = df[y_column].to_numpy(dtype=float)
+    visible = viewport_mask(x, y, sampling['x_range'], sampling['y_range'])
+    if sampling['max_points'] is None:
+        rows = np.flatnonzero(visible)
+    else:
+        rows = downsample(
+            x, y, df['RCS_SIZE'].cat.codes.to_numpy(), sampling['max_points'],
+            sampling['x_range'], sampling['y_range'],
+            # Catalog row positions, so zooming keeps the points already shown
+            keys=df.index.to_numpy()
+        )
+    
+    return df.iloc[rows], {
+        'total': int(np.count_nonzero(visible)),
+        'returned': len(rows),
+        'max_points': sampling['max_points']
+    }
+
+def read_payload():
+    """
+    Read the optional columnar payload parameters
+
+    `shape=columnar` sends each scatter trace as typed arrays without
+    per-point hover text; `precision=float32` halves the coordinate bytes.
+
+    Returns:
+        tuple: (payload options or None for the default shape, error response or None)
+    """
+    shape = request.args.get('shape', default='records', type=str)
+    precision = request.args.get('precision', default='float64', type=str)
+    if shape not in ('records', 'columnar'):
+        return None, (json_response({'error': f'Unsupported shape: {shape}'}), 400)
+    if precision not in ('float64', 'float32'):
+        return None, (json_response({'error': f'Unsupported precision: {precision}'}), 400)
+    if shape == 'records':
+        return None, None
+    return {'precision': precision}, None
+
+def category_dictionaries(df):
+    """Values behind the codes of the dictionary-encoded hover columns"""
+    return {column: list(df[column].cat.categories) for column in HOVER_COLUMNS}
+
+def axis_range(default, value_range):
+    """Axis range for the layout, narrowed to the requested viewport"""
+    low, high = value_range if value_range is not None else (None, None)
+    return [default[0] if low is None else low, default[1] if high is None else high]
 
 @visualization_routes.route('/orbit-distribution', methods=['GET'])
+@cached_response
 def get_orbit_distribution():
-    """Get orbit distribution visualization data"""
-    df = load_data()
+    """
+    Get orbit distribution visualization data
+
+    Supports `max_points` downsampling, an `x_min`/`x_max` (period, hours)
+    and `y_min`/`y_max` (inclination) viewport, and `shape=columnar`.
+    """
+    sampling, error = read_sampling()
+    if error:
+        return error
+    payload, error = read_payload()
+    if error:
+        return error
+    
+    df, error = load_data()
     if df is None:
-        return jsonify({'error': 'Failed to load data'}), 500
+        return error
     
     # Filter out rows with missing values
     df = df.dropna(subset=['PERIOD', 'INCLINATION'])
+    df, sampled = sample_scatter(df, 'PERIOD_HOURS', 'INCLINATION', sampling)
     
-    # Create a new column for period in hours
-    df['PERIOD_HOURS'] = df['PERIOD'] / 60
-    
-    # Create scatter plot data
-    scatter_data = []
-    
-    # Group by RCS_SIZE
-    for rcs_size in df['RCS_SIZE'].unique():
-        if pd.isna(rcs_size):
-            continue
-            
-        size_df = df[df['RCS_SIZE'] == rcs_size]
-        
-        scatter_data.append({
-            'x': size_df['PERIOD_HOURS'].tolist(),
-            'y': size_df['INCLINATION'].tolist(),
-            'mode': 'markers',
-            'type': 'scatter',
-            'name': rcs_size,
-            'text': [f"Object Type: {obj_type}<br>Country: {country}<br>Period: {period:.2f} hours<br>Inclination: {incl:.2f}°"
-                    for obj_type, country, period, incl in zip(
-                        size_df['OBJECT_TYPE'], 
-                        size_df['COUNTRY_CODE'], 
-                        size_df['PERIOD_HOURS'], 
-                        size_df['INCLINATION']
-                    )],
-            'hoverinfo': 'text'
-        })
+    # Create scatter plot data, one trace per RCS size
+    scatter_data = scatter_traces(RowGroups(df), 'PERIOD_HOURS', 'INCLINATION',
+                                  ORBIT_TEXT, ORBIT_HOVER, payload, HOVER_COLUMNS)
     
     # Create layout
     layout = {
         'title': 'Orbit Distribution by RCS Size',
         'xaxis': {
             'title': 'Period (hours)',
-            'range': [0, 30]
+            'range': axis_range([0, 30], sampling and sampling['x_range'])
         },
         'yaxis': {
             'title': 'Inclination (degrees)',
-            'range': [0, 180]
+            'range': axis_range([0, 180], sampling and sampling['y_range'])
         },
         'hovermode': 'closest'
     }
     
-    return jsonify({
+    response = {
         'data': scatter_data,
         'layout': layout
-    })
+    }
+    if sampled:
+        response['sampling'] = sampled
+    if payload:
+        response['dictionaries'] = category_dictionaries(df)
+    return json_response(response)
 
 @visualization_routes.route('/country-distribution', methods=['GET'])
+@cached_response
 def get_country_distribution():
     """Get country distribution visualization data"""
-    df = load_data()
-    if df is None:
-        return jsonify({'error': 'Failed to load data'}), 500
-    
-    # Count objects by country
-    country_counts = df['COUNTRY_CODE'].value_counts().reset_index()
-    country_counts.columns = ['country', 'count']
+    cube, error = load_cube()
+    if cube is None:
+        return error
     
-    # Get top 10 countries
-    top_countries = country_counts.head(10)
+    # Get top 10 countries by object count
+    top_countries = cube.counts_by('COUNTRY_CODE')[:10]
     
     # Create bar chart data
     bar_data = [{
-        'x': top_countries['country'].tolist(),
-        'y': top_countries['count'].tolist(),
+        'x': [country for country, count in top_countries],
+        'y': [count for country, count in top_countries],
         'type': 'bar',
         'marker': {
             'color': 'rgba(50, 171, 96, 0.7)'
@@ -157,175 +239,195 @@ def get_country_distribution():
         }
     }
     
-    return jsonify({
+    return json_response({
         'data': bar_data,
         'layout': layout
     })
 
 @visualization_routes.route('/size-type-distribution', methods=['GET'])
+@cached_response
 def get_size_type_distribution():
     """Get size and type distribution visualization data"""
-    df = load_data()
-    if df is None:
-        return jsonify({'error': 'Failed to load data'}), 500
-    
-    # Create a pivot table of object type vs RCS size
-    pivot_df = pd.pivot_table(
-        df, 
-        values='OBJECT_ID', 
-        index='OBJECT_TYPE', 
-        columns='RCS_SIZE', 
-        aggfunc='count',
-        fill_value=0
-    ).reset_index()
+    cube, error = load_cube()
+    if cube is None:
+        return error
+    
+    # Cross-tabulate object type vs RCS size from the aggregate cube
+    obj_types, sizes, counts = cube.pivot('OBJECT_TYPE', 'RCS_SIZE')
     
     # Convert to list of dictionaries for JSON serialization
-    heatmap_data = []
-    for _, row in pivot_df.iterrows():
-        obj_type = row['OBJECT_TYPE']
-        for size in pivot_df.columns[1:]:  # Skip the first column (OBJECT_TYPE)
-            if not pd.isna(size):
-                heatmap_data.append({
-                    'object_type': obj_type,
-                    'rcs_size': size,
-                    'count': int(row[size])
-                })
-    
-    return jsonify(heatmap_data)
+    heatmap_data = [
+        {'object_type': obj_type, 'rcs_size': size, 'count': count}
+        for obj_type, row in zip(obj_types, counts.tolist())
+        for size, count in zip(sizes, row)
+    ]
+    
+    return json_response(heatmap_data)
 
 @visualization_routes.route('/orbital-parameters', methods=['GET'])
+@cached_response
 def get_orbital_parameters():
-    """Get orbital parameters visualization data"""
-    df = load_data()
+    """
+    Get orbital parameters visualization data
+
+    Supports `max_points` downsampling, applied to each plot separately,
+    and `shape=columnar`.
+    A viewport (`x_min`, `x_max`, `y_min`, `y_max`) is in the axes of one
+    plot, so it needs `plot=eccentricity_period` or
+    `plot=inclination_eccentricity`; `plot` also limits the response to
+    that plot.
+    """
+    sampling, error = read_sampling()
+    if error:
+        return error
+    
+    payload, error = read_payload()
+    if error:
+        return error
+    
+    plot = request.args.get('plot', default=None, type=str)
+    if plot not in (None, 'eccentricity_period', 'inclination_eccentricity'):
+        return json_response({'error': f'Unknown plot: {plot}'}), 400
+    if plot is None and sampling and (sampling['x_range'] != (None, None) or sampling['y_range'] != (None, None)):
+        return json_response({'error': 'A viewport needs the plot parameter'}), 400
+    
+    df, error = load_data()
     if df is None:
-        return jsonify({'error': 'Failed to load data'}), 500
+        return error
     
     # Filter out rows with missing values
     df = df.dropna(subset=['ECCENTRICITY', 'INCLINATION', 'PERIOD'])
+    response = {}
     
-    # Create a new column for period in hours
-    df['PERIOD_HOURS'] = df['PERIOD'] / 60
-    
-    # Create scatter plot data for eccentricity vs period
-    ecc_period_data = []
+    # Without sampling both plots use the same rows, so they share one grouping
+    shared = RowGroups(df) if sampling is None else None
     
-    # Group by RCS_SIZE
-    for rcs_size in df['RCS_SIZE'].unique():
-        if pd.isna(rcs_size):
-            continue
-            
-        size_df = df[df['RCS_SIZE'] == rcs_size]
+    if plot != 'inclination_eccentricity':
+        # Create scatter plot data for eccentricity vs period
+        ecc_period_df, sampled = sample_scatter(df, 'PERIOD_HOURS', 'ECCENTRICITY', sampling)
+        ecc_period_data = scatter_traces(shared or RowGroups(ecc_period_df), 'PERIOD_HOURS', 'ECCENTRICITY',
+                                         ECC_PERIOD_TEXT, ECC_PERIOD_HOVER, payload, HOVER_COLUMNS)
         
-        ecc_period_data.append({
-            'x': size_df['PERIOD_HOURS'].tolist(),
-            'y': size_df['ECCENTRICITY'].tolist(),
-            'mode': 'markers',
-            'type': 'scatter',
-            'name': rcs_size,
-            'text': [f"Object Type: {obj_type}<br>Country: {country}<br>Period: {period:.2f} hours<br>Eccentricity: {ecc:.4f}"
-                    for obj_type, country, period, ecc in zip(
-                        size_df['OBJECT_TYPE'], 
-                        size_df['COUNTRY_CODE'], 
-                        size_df['PERIOD_HOURS'], 
-                        size_df['ECCENTRICITY']
-                    )],
-            'hoverinfo': 'text'
-        })
-    
-    # Create layout for eccentricity vs period
-    ecc_period_layout = {
-        'title': 'Eccentricity vs Period by RCS Size',
-        'xaxis': {
-            'title': 'Period (hours)',
-            'range': [0, 30]
-        },
-        'yaxis': {
-            'title': 'Eccentricity',
-            'range': [0, 1]
-        },
-        'hovermode': 'closest'
-    }
-    
-    # Create scatter plot data for inclination vs eccentricity
-    inc_ecc_data = []
-    
-    # Group by RCS_SIZE
-    for rcs_size in df['RCS_SIZE'].unique():
-        if pd.isna(rcs_size):
-            continue
-            
-        size_df = df[df['RCS_SIZE'] == rcs_size]
+        # Create layout for eccentricity vs period
+        ecc_period_layout = {
+            'title': 'Eccentricity vs Period by RCS Size',
+            'xaxis': {
+                'title': 'Period (hours)',
+                'range': axis_range([0, 30], sampling and sampling['x_range'])
+            },
+            'yaxis': {
+                'title': 'Eccentricity',
+                'range': axis_range([0, 1], sampling and sampling['y_range'])
+            },
+            'hovermode': 'closest'
+        }
         
-        inc_ecc_data.append({
-            'x': size_df['ECCENTRICITY'].tolist(),
-            'y': size_df['INCLINATION'].tolist(),
-            'mode': 'markers',
-            'type': 'scatter',
-            'name': rcs_size,
-            'text': [f"Object Type: {obj_type}<br>Country: {country}<br>Eccentricity: {ecc:.4f}<br>Inclination: {incl:.2f}°"
-                    for obj_type, country, ecc, incl in zip(
-                        size_df['OBJECT_TYPE'], 
-                        size_df['COUNTRY_CODE'], 
-                        size_df['ECCENTRICITY'], 
-                        size_df['INCLINATION']
-                    )],
-            'hoverinfo': 'text'
-        })
-    
-    # Create layout for inclination vs eccentricity
-    inc_ecc_layout = {
-        'title': 'Inclination vs Eccentricity by RCS Size',
-        'xaxis': {
-            'title': 'Eccentricity',
-            'range': [0, 1]
-        },
-        'yaxis': {
-            'title': 'Inclination (degrees)',
-            'range': [0, 180]
-        },
-        'hovermode': 'closest'
-    }
-    
-    return jsonify({
-        'eccentricity_period': {
+        response['eccentricity_period'] = {
             'data': ecc_period_data,
             'layout': ecc_period_layout
-        },
-        'inclination_eccentricity': {
+        }
+        if sampled:
+            response['eccentricity_period']['sampling'] = sampled
+    
+    if plot != 'eccentricity_period':
+        # Create scatter plot data for inclination vs eccentricity
+        inc_ecc_df, sampled = sample_scatter(df, 'ECCENTRICITY', 'INCLINATION', sampling)
+        inc_ecc_data = scatter_traces(shared or RowGroups(inc_ecc_df), 'ECCENTRICITY', 'INCLINATION',
+                                      INC_ECC_TEXT, INC_ECC_HOVER, payload, HOVER_COLUMNS)
+        
+        # Create layout for inclination vs eccentricity
+        inc_ecc_layout = {
+            'title': 'Inclination vs Eccentricity by RCS Size',
+            'xaxis': {
+                'title': 'Eccentricity',
+                'range': axis_range([0, 1], sampling and sampling['x_range'])
+            },
+            'yaxis': {
+                'title': 'Inclination (degrees)',
+                'range': axis_range([0, 180], sampling and sampling['y_range'])
+            },
+            'hovermode': 'closest'
+        }
+        
+        response['inclination_eccentricity'] = {
             'data': inc_ecc_data,
             'layout': inc_ecc_layout
         }
-    })
+        if sampled:
+            response['inclination_eccentricity']['sampling'] = sampled
+    
+    if payload:
+        response['dictionaries'] = category_dictionaries(df)
+    return json_response(response)
+
+def load_altitudes():
+    """
+    Get per-RCS-size sorted altitudes, over the filtered rows when `filter` is given
+
+    Returns:
+        tuple: (GroupedValues or None, error response or None)
+    """
+    if not request.args.get('filter'):
+        snapshot, error = catalog_store.load_snapshot()
+        if snapshot is None:
+            return None, (json_response({'error': 'Failed to load data'}), 500)
+        return snapshot.derived('altitudes', lambda: GroupedValues(snapshot.df, 'ALTITUDE_KM', 'RCS_SIZE')), None
+    
+    df, error = load_data()
+    if df is None:
+        return None, error
+    return GroupedValues(df, 'ALTITUDE_KM', 'RCS_SIZE'), None
 
 @visualization_routes.route('/altitude-distribution', methods=['GET'])
+@cached_response
 def get_altitude_distribution():
-    """Get altitude distribution visualization data"""
-    df = load_data()
-    if df is None:
-        return jsonify({'error': 'Failed to load data'}), 500
+    """
+    Get altitude distribution visualization data
+
+    Counts are binned on the server and sent as one bar trace per RCS size.
+    `bins` (default 50) or `bin_width` (km) set the binning, `log=true`
+    uses logarithmically spaced bins, and `alt_min` / `alt_max` set the
+    window (default: the range of positive altitudes).
+    """
+    bins = request.args.get('bins', default=50, type=int)
+    bin_width = request.args.get('bin_width', default=None, type=float)
+    log = request.args.get('log', default='false', type=str).lower() in ('1', 'true', 'yes')
+    alt_min = request.args.get('alt_min', default=None, type=float)
+    alt_max = request.args.get('alt_max', default=None, type=float)
     
-    # Calculate altitude (km) from semimajor axis (Earth radius ~ 6371 km)
-    df['ALTITUDE_KM'] = df['SEMIMAJOR_AXIS'] - 6371
+    altitudes, error = load_altitudes()
+    if altitudes is None:
+        return error
     
-    # Filter out negative altitudes (should not happen, but just in case)
-    df = df[df['ALTITUDE_KM'] > 0]
+    # Negative altitudes should not happen, but they are left out just in case
+    low, high = altitudes.range(above=0)
+    if alt_min is None:
+        alt_min = low if log else 0
+    if alt_max is None:
+        alt_max = high
     
-    # Create histogram data
-    histogram_data = []
+    if alt_min is None or alt_max is None:
+        # No positive altitudes (e.g. the filter matched none) and no window
+        # given to bin them over: empty traces rather than an error
+        edges = np.empty(0)
+        counts = np.zeros((len(altitudes.groups), 0), dtype=np.int64)
+    else:
+        try:
+            edges = histogram_edges(alt_min, alt_max, bins, bin_width, log)
+        except ValueError as e:
+            return json_response({'error': str(e)}), 400
+        counts = altitudes.histogram(edges, above=0)
     
-    # Group by RCS_SIZE
-    for rcs_size in df['RCS_SIZE'].unique():
-        if pd.isna(rcs_size):
-            continue
-            
-        size_df = df[df['RCS_SIZE'] == rcs_size]
-        
+    # Create bar traces, one per RCS size
+    histogram_data = []
+    for rcs_size, size_counts in zip(altitudes.groups, counts):
         histogram_data.append({
-            'x': size_df['ALTITUDE_KM'].tolist(),
-            'type': 'histogram',
+            'x': (np.sqrt(edges[:-1] * edges[1:]) if log else (edges[:-1] + edges[1:]) / 2),
+            'y': size_counts,
+            'width': np.diff(edges),
+            'type': 'bar',
             'name': rcs_size,
-            'opacity': 0.7,
-            'nbinsx': 50
+            'opacity': 0.7
         })
     
     # Create layout
@@ -333,15 +435,87 @@ def get_altitude_distribution():
         'title': 'Altitude Distribution by RCS Size',
         'xaxis': {
             'title': 'Altitude (km)',
-            'range': [0, 40000]
+            'type': 'log' if log else 'linear'
         },
         'yaxis': {
             'title': 'Count'
         },
-        'barmode': 'overlay'
+        'barmode': 'overlay',
+        'bargap': 0
     }
+    if len(edges):
+        layout['xaxis']['range'] = np.log10([edges[0], edges[-1]]) if log else [edges[0], edges[-1]]
     
-    return jsonify({
+    return json_response({
         'data': histogram_data,
+        'edges': edges,
         'layout': layout
-    }) 
\ No newline at end of file
+    })
+
+@visualization_routes.route('/density-tiles', methods=['GET'])
+@cached_response
+def get_density_tile_views():
+    """List the views served as density tiles, with their axes and zoom levels"""
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': 'Failed to load data'}), 500
+    
+    return json_response({
+        'tile_size': TILE_SIZE,
+        'max_zoom': MAX_ZOOM,
+        'groups': list(snapshot.df['RCS_SIZE'].cat.categories),
+        'views': {
+            view: {
+                'x': {'column': spec['x'], 'range': list(spec['x_range'])},
+                'y': {'column': spec['y'], 'range': list(spec['y_range'])}
+            }
+            for view, spec in DENSITY_VIEWS.items()
+        }
+    })
+
+@visualization_routes.route('/density-tiles/<view>/<int:zoom>/<int:tile_x>/<int:tile_y>', methods=['GET'])
+@cached_response
+def get_density_tile(view, zoom, tile_x, tile_y):
+    """
+    Get one tile of a pre-binned density view
+
+    At zoom level z each axis is split into 2**z tiles, and every tile is a
+    TILE_SIZE x TILE_SIZE grid of object counts per RCS size, sent as typed
+    arrays that a plotly heatmap takes as `z`. The grids are built once per
+    catalog snapshot, so a tile costs the same at any catalog size.
+    """
+    if view not in DENSITY_VIEWS:
+        return json_response({'error': f'Unknown density view: {view}'}), 404
+    
+    snapshot, error = catalog_store.load_snapshot()
+    if snapshot is None:
+        return json_response({'error': 'Failed to load data'}), 500
+    
+    tiles = snapshot.derived(f'density_tiles:{view}', lambda: DensityTiles(snapshot.df, view))
+    try:
+        grids = tiles.tile(zoom, tile_x, tile_y)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 404
+    x_range, y_range = tiles.tile_range(zoom, tile_x, tile_y)
+    
+    # One heatmap per RCS size, skipping sizes with nothing in this tile
+    traces = []
+    for name, grid in zip(tiles.groups, grids):
+        count = int(grid.sum())
+        if count == 0:
+            continue
+        traces.append({
+            'name': name,
+            'count': count,
+            # Smallest unsigned type that holds the largest bin
+            'z': typed_array(grid, np.min_scalar_type(int(grid.max())))
+        })
+    
+    return json_response({
+        'view': view,
+        'zoom': zoom,
+        'tile': {'x': tile_x, 'y': tile_y},
+        'x': {'column': tiles.spec['x'], 'range': list(x_range), 'bins': TILE_SIZE},
+        'y': {'column': tiles.spec['y'], 'range': list(y_range), 'bins': TILE_SIZE},
+        'traces': traces
+    })
@@ -1,5 +1,5 @@
 import os
-from flask import Flask, jsonify, request
+from flask import Flask, request
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
@@ -10,12 +10,13 @@ from flask_socketio import SocketIO
 
 # Import API routes
 from api.debris_data import debris_routes
-from api.prediction import prediction_routes
+from api.prediction import model_loader, prediction_routes
 from api.visualization import visualization_routes
 from api.newsletter import newsletter_routes
 from api.real_time import real_time_routes
 from api.events import events_routes
 from api.auth import auth_routes
+from utils.json_response import init_json_response, json_response
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +24,9 @@ load_dotenv()
 # Initialize Flask app
 app = Flask(__name__)
 
+# Serialize responses (including NumPy / pandas values) with the fast encoder
+init_json_response(app)
+
 # Enable CORS for all routes with more permissive settings
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
@@ -41,15 +45,24 @@ app.register_blueprint(auth_routes, url_prefix='/api/auth')
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint to verify API is running"""
-    return jsonify({
+    return json_response({
         'status': 'success',
         'message': 'Space Debris API is running'
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint reporting the load state of every prediction model"""
+    ready = model_loader.ready()
+    return json_response({
+        'ready': ready,
+        'models': model_loader.status()
+    }), 200 if ready else 503
+
 @app.route('/api/info', methods=['GET'])
 def api_info():
     """Endpoint to provide information about the API"""
-    return jsonify({
+    return json_response({
         'name': 'Space Debris API',
         'version': '1.1.0',
         'description': 'API for space debris visualization and prediction',
@@ -61,6 +74,7 @@ def api_info():
             '/api/events - Space events calendar',
             '/api/auth - User authentication',
             '/api/health - Health check endpoint',
+            '/api/ready - Prediction model readiness endpoint',
             '/api/info - API information endpoint'
         ]
     })
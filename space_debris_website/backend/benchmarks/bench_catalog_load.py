@@ -0,0 +1,97 @@
+"""
+Compare catalog load time and memory: CSV parse vs columnar sidecar
+
+Each measurement runs in a fresh interpreter so RSS reflects only that load.
+RssAnon is private memory; RssFile is file-backed memory that gunicorn
+workers mapping the same sidecar share through the page cache.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_catalog_load --rows 100000 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _memory_kb():
+    """Return (RssAnon, RssFile) in kB for this process (Linux only)"""
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('RssAnon', 'RssFile'):
+                values[key] = int(rest.split()[0])
+    return values.get('RssAnon', 0), values.get('RssFile', 0)
+
+
+def _worker(mode, csv_path):
+    """Load the catalog once in this process and report timing and memory"""
+    import numpy as np
+    import pandas as pd
+    from utils.columnar_cache import read_catalog_csv
+
+    anon_before, file_before = _memory_kb()
+    start = time.perf_counter()
+    if mode == 'csv':
+        df = pd.read_csv(csv_path)
+    else:
+        df = read_catalog_csv(csv_path)
+    elapsed = time.perf_counter() - start
+
+    # Touch every numeric column so mapped pages are actually resident
+    for column in df.select_dtypes(include=[np.number]).columns:
+        df[column].sum()
+
+    anon_after, file_after = _memory_kb()
+    print(json.dumps({
+        'seconds': elapsed,
+        'rss_anon_mb': (anon_after - anon_before) / 1024,
+        'rss_file_mb': (file_after - file_before) / 1024
+    }))
+
+
+def _run(mode, csv_path, cache_dir):
+    env = dict(os.environ, CATALOG_CACHE_DIR=cache_dir)
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_catalog_load', '--worker', mode, csv_path],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(rows_list):
+    from benchmarks.synthetic_catalog import write_catalog
+
+    print(f"{'rows':>9} {'mode':>14} {'seconds':>9} {'anon MB':>9} {'file MB':>9}")
+    for rows in rows_list:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = write_catalog(os.path.join(tmp, 'space_decay.csv'), rows)
+            cache_dir = os.path.join(tmp, 'cache')
+            results = [
+                ('csv', _run('csv', csv_path, cache_dir)),
+                # First sidecar read parses the CSV and writes the sidecar
+                ('sidecar-build', _run('sidecar', csv_path, cache_dir)),
+                ('sidecar', _run('sidecar', csv_path, cache_dir))
+            ]
+            for mode, result in results:
+                print(f"{rows:>9} {mode:>14} {result['seconds']:>9.3f} "
+                      f"{result['rss_anon_mb']:>9.1f} {result['rss_file_mb']:>9.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'CSV_PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    if args.worker:
+        _worker(*args.worker)
+    else:
+        main(args.rows)
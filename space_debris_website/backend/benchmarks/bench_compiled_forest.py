@@ -0,0 +1,97 @@
+"""
+Compare scikit-learn's predict_proba with the compiled forest evaluator
+
+Fits the RCS model the way RCSPredictor._train_model does (StandardScaler,
+100 trees, depth 10) on a synthetic catalog, then times single rows and
+batches through scikit-learn, the bare traversal and the compiled forest
+(traversal up to max_rows, scikit-learn beyond), and checks that the
+probabilities are identical.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_compiled_forest --rows 50000 --batch 64 1024 10000
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from benchmarks.synthetic_catalog import make_catalog
+from utils.catalog import add_derived_columns
+from utils.compiled_forest import CompiledForest
+
+# RCSPredictor.features
+RCS_FEATURES = [
+    'OBJECT_AGE', 'CENT_FOCUS_DIST', 'APOAPSIS', 'PERIAPSIS',
+    'MEAN_ANOMALY', 'MEAN_MOTION', 'INCLINATION', 'RA_OF_ASC_NODE',
+    'ARG_OF_PERICENTER', 'PERIOD'
+]
+
+
+def fit(rows):
+    """Scaler, forest and feature matrix of the RCS model on a synthetic catalog"""
+    df = make_catalog(rows)
+    add_derived_columns(df)
+    df = df[df['OBJECT_TYPE'] == 'DEBRIS'].dropna(subset=['RCS_SIZE'])
+    X = df[RCS_FEATURES].to_numpy()
+    y = df['RCS_SIZE'].astype(str).map({'SMALL': 1, 'MEDIUM': 2, 'LARGE': 3})
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42)
+    model.fit(scaler.transform(X), y)
+    return scaler, model, X
+
+
+def latencies(score, X, count):
+    """Per-call milliseconds of `count` single-row calls"""
+    times = []
+    for i in range(count):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        score(row)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000
+
+
+def best_of(score, X, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(rows, batches, singles, repeat):
+    scaler, model, X = fit(rows)
+    start = time.perf_counter()
+    compiled = CompiledForest(model, scaler)
+    compile_ms = (time.perf_counter() - start) * 1000
+    traversal = CompiledForest(model, scaler, max_rows=float('inf'))
+    paths = [
+        ('scikit-learn', lambda X: model.predict_proba(scaler.transform(X))),
+        ('traversal only', traversal.predict_proba),
+        ('compiled', compiled.predict_proba)
+    ]
+
+    identical = np.array_equal(paths[0][1](X), paths[1][1](X))
+    print(f"{len(X)} training rows, {len(compiled.feature)} nodes, compiled in {compile_ms:.0f} ms")
+    print(f"traversal probabilities identical on all training rows: {'yes' if identical else 'NO'}")
+    print(f"compiled hands batches over {compiled.max_rows} rows to scikit-learn")
+    print()
+    header = ''.join(f"{f'{batch}-row ms':>13}" for batch in batches)
+    print(f"{'path':>15} {'1-row p50 ms':>13} {'1-row p99 ms':>13}{header}")
+    for name, score in paths:
+        single = latencies(score, X, singles)
+        batch_ms = ''.join(f"{best_of(score, X[:batch], repeat):>13.1f}" for batch in batches)
+        print(f"{name:>15} {np.percentile(single, 50):>13.3f} {np.percentile(single, 99):>13.3f}{batch_ms}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=50000, help='synthetic catalog size')
+    parser.add_argument('--batch', type=int, nargs='+', default=[64, 1024, 10000])
+    parser.add_argument('--singles', type=int, default=500, help='single-row calls timed per path')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.batch, args.singles, args.repeat)
@@ -0,0 +1,61 @@
+"""
+Time /api/visualization/orbit-distribution with each response encoder
+
+`json` is the standard library encoder that flask.jsonify used before;
+`orjson` serializes the NumPy columns directly.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_json_encoder --rows 100000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from flask import Flask
+
+from api.visualization import visualization_routes
+from benchmarks.synthetic_catalog import write_catalog
+from utils.catalog import catalog_store
+from utils.json_response import ENCODERS, init_json_response
+from utils.response_cache import response_cache
+
+ENDPOINT = '/api/visualization/orbit-distribution'
+
+
+def make_client(encoder):
+    app = Flask(__name__)
+    init_json_response(app, encoder)
+    app.register_blueprint(visualization_routes, url_prefix='/api/visualization')
+    return app.test_client()
+
+
+def main(rows, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['SPACE_DECAY_CSV'] = write_catalog(os.path.join(tmp, 'space_decay.csv'), rows)
+        os.environ['CATALOG_CACHE_DIR'] = os.path.join(tmp, 'cache')
+        catalog_store.snapshot()
+
+        print(f"{ENDPOINT} on {rows:,} rows ({repeat} requests each)")
+        print(f"{'encoder':>8} {'p50 ms':>9} {'min ms':>9} {'bytes':>12}")
+        for encoder in ENCODERS:
+            client = make_client(encoder)
+            client.get(ENDPOINT)  # warm up
+            timings = []
+            for _ in range(repeat):
+                # Otherwise every request is a cached body built by the first encoder
+                response_cache.clear()
+                start = time.perf_counter()
+                response = client.get(ENDPOINT)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{encoder:>8} {statistics.median(timings):>9.1f} {min(timings):>9.1f} "
+                  f"{len(response.get_data()):>12,}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
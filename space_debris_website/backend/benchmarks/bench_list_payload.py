@@ -0,0 +1,57 @@
+"""
+Measure /api/debris-data payload size and serialization time by response shape
+
+Compares full records (the previous behaviour), a `fields` projection, and
+the projected columnar shape on 100-row and 10k-row pages.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_list_payload
+"""
+import argparse
+import json
+import time
+
+from api.debris_data import select_rows, serialize_rows
+from benchmarks.synthetic_catalog import make_catalog
+
+# A typical table view: identity, classification and a few orbital elements
+PROJECTED_FIELDS = ['NORAD_CAT_ID', 'OBJECT_NAME', 'OBJECT_TYPE', 'RCS_SIZE',
+                    'COUNTRY_CODE', 'PERIOD', 'INCLINATION', 'ECCENTRICITY']
+
+
+def measure(df, rows, columns, shape, repeat):
+    """Return (bytes, milliseconds) to build and JSON-encode one page"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = json.dumps({'data': serialize_rows(select_rows(df, rows, columns), shape)},
+                             separators=(',', ':'))
+        best = min(best, time.perf_counter() - start)
+    return len(payload.encode()), best * 1000
+
+
+def main(page_sizes, repeat):
+    df = make_catalog(max(page_sizes))
+    projected = list(df.columns.get_indexer(PROJECTED_FIELDS))
+    variants = [
+        ('all fields, records', None, 'records'),
+        ('projected, records', projected, 'records'),
+        ('projected, columnar', projected, 'columnar')
+    ]
+
+    print(f"{'rows':>6} {'variant':>22} {'bytes':>11} {'ms':>8} {'size %':>7} {'time %':>7}")
+    for page_size in page_sizes:
+        baseline = None
+        for name, columns, shape in variants:
+            size, ms = measure(df, slice(0, page_size), columns, shape, repeat)
+            baseline = baseline or (size, ms)
+            print(f"{page_size:>6} {name:>22} {size:>11,} {ms:>8.2f} "
+                  f"{100 * size / baseline[0]:>6.0f}% {100 * ms / baseline[1]:>6.0f}%")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
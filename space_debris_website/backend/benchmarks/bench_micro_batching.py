@@ -0,0 +1,104 @@
+"""
+Load-test single-object RCS predictions with and without micro-batching
+
+Every client thread POSTs single objects to /api/prediction/rcs through the
+Flask test client, back to back. Without a batcher each request evaluates
+the forest on its own; with one, requests in flight at the same time are
+scored together in a single predict_proba call. The forest is fitted on a
+synthetic catalog in memory, so nothing on disk is touched.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_micro_batching --clients 50 100 200 500
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+from flask import Flask
+from sklearn.ensemble import RandomForestClassifier
+
+from api import prediction
+from benchmarks.synthetic_catalog import make_catalog
+from utils.catalog import add_derived_columns
+from utils.micro_batch import DEFAULT_MAX_BATCH, DEFAULT_WINDOW_MS, MicroBatcher
+
+
+def fit_rcs_model(rows):
+    """Fit the RCS predictor on a synthetic catalog and return sample request bodies"""
+    df = make_catalog(rows)
+    add_derived_columns(df)
+    df = df[df['OBJECT_TYPE'] == 'DEBRIS'].dropna(subset=['RCS_SIZE'])
+    prediction.model_loader.wait()
+    predictor = prediction.model_loader.get('rcs')
+    X = df[predictor.features].to_numpy()
+    y = df['RCS_SIZE'].astype(str).map({'SMALL': 1, 'MEDIUM': 2, 'LARGE': 3})
+    predictor.scaler.fit(X)
+    predictor.model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42)
+    predictor.model.fit(predictor.scaler.transform(X), y)
+    return df[predictor.features].head(1000).to_dict('records')
+
+
+def run(app, bodies, clients, requests_per_client):
+    """Return (requests per second, p50 ms, p99 ms) for one load level"""
+    latencies = [[] for _ in range(clients)]
+    start_line = threading.Barrier(clients + 1)
+
+    def client(i):
+        test_client = app.test_client()
+        start_line.wait()
+        for j in range(requests_per_client):
+            body = bodies[(i * requests_per_client + j) % len(bodies)]
+            sent = time.perf_counter()
+            response = test_client.post('/api/prediction/rcs', json=body)
+            latencies[i].append(time.perf_counter() - sent)
+            assert response.status_code == 200
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    start_line.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main(client_counts, requests_per_client, window_ms, max_batch):
+    bodies = fit_rcs_model(20000)
+    app = Flask(__name__)
+    app.register_blueprint(prediction.prediction_routes, url_prefix='/api/prediction')
+    predictor = prediction.model_loader.get('rcs')
+    # Repeated bodies would otherwise be answered from the prediction cache
+    # and never reach the forest (or the batcher)
+    cache_entries = predictor.cache.max_entries
+    predictor.cache.max_entries = 0
+    # Compile the freshly fitted forest before anything is timed
+    app.test_client().post('/api/prediction/rcs', json=bodies[0])
+
+    print(f"{'clients':>8} {'mode':>14} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'rows/batch':>11}")
+    for clients in client_counts:
+        baseline = None
+        for mode in ('direct', 'micro-batched'):
+            batcher = MicroBatcher(predictor._evaluate, max_batch, window_ms) if mode != 'direct' else None
+            predictor.batcher = batcher
+            throughput, p50, p99 = run(app, bodies, clients, requests_per_client)
+            baseline = baseline or throughput
+            rows = f"{batcher.rows / max(batcher.batches, 1):.1f}" if batcher else '1.0'
+            print(f"{clients:>8} {mode:>14} {throughput:>9.0f} {p50:>9.1f} {p99:>9.1f} {rows:>11}"
+                  f"   ({throughput / baseline:.1f}x)")
+        predictor.batcher = None
+    predictor.cache.max_entries = cache_entries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, nargs='+', default=[50, 100, 200, 500])
+    parser.add_argument('--requests', type=int, default=10, help='requests per client')
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW_MS)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    args = parser.parse_args()
+    main(args.clients, args.requests, args.window_ms, args.max_batch)
@@ -0,0 +1,97 @@
+"""
+Measure scatter trace building: per-group frame scans vs one grouping pass
+
+The previous handlers looped over df['RCS_SIZE'].unique() and re-scanned
+the frame with a boolean mask per group, once per plot. RowGroups groups
+the rows once and slices every trace out of contiguous arrays. Timings
+cover building the traces of /orbit-distribution and both plots of
+/orbital-parameters, without JSON encoding.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_visualization --rows 10000 100000 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from api.visualization import (ECC_PERIOD_HOVER, ECC_PERIOD_TEXT, HOVER_COLUMNS, INC_ECC_HOVER,
+                               INC_ECC_TEXT, ORBIT_HOVER, ORBIT_TEXT)
+from benchmarks.synthetic_catalog import make_catalog
+from utils.catalog import add_derived_columns
+from utils.catalog_index import INDEXED_COLUMNS
+from utils.grouped_traces import RowGroups, scatter_traces
+
+PLOTS = [
+    ('PERIOD_HOURS', 'INCLINATION', ORBIT_TEXT, ORBIT_HOVER),
+    ('PERIOD_HOURS', 'ECCENTRICITY', ECC_PERIOD_TEXT, ECC_PERIOD_HOVER),
+    ('ECCENTRICITY', 'INCLINATION', INC_ECC_TEXT, INC_ECC_HOVER)
+]
+
+
+def per_group_scan(df):
+    """The previous handlers: one boolean scan of the frame per group and plot"""
+    traces = []
+    for x_column, y_column, text, _ in PLOTS:
+        for rcs_size in df['RCS_SIZE'].unique():
+            if pd.isna(rcs_size):
+                continue
+            size_df = df[df['RCS_SIZE'] == rcs_size]
+            traces.append({
+                'x': size_df[x_column].to_numpy(),
+                'y': size_df[y_column].to_numpy(),
+                'name': rcs_size,
+                'text': [text.format(obj_type, country, x, y)
+                         for obj_type, country, x, y in zip(
+                             size_df['OBJECT_TYPE'], size_df['COUNTRY_CODE'],
+                             size_df[x_column], size_df[y_column])]
+            })
+    return traces
+
+
+def grouped(df, payload):
+    """One RowGroups shared by every plot"""
+    groups = RowGroups(df)
+    traces = []
+    for x_column, y_column, text, hover in PLOTS:
+        traces += scatter_traces(groups, x_column, y_column, text, hover, payload, HOVER_COLUMNS)
+    return traces
+
+
+def measure(build, df, repeat):
+    """Best time in milliseconds over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(df)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(row_counts, repeat):
+    variants = [
+        ('per-group scan, text', per_group_scan),
+        ('grouped, text', lambda df: grouped(df, None)),
+        ('grouped, columnar', lambda df: grouped(df, {'precision': 'float64'}))
+    ]
+
+    print(f"{'rows':>8} {'variant':>22} {'ms':>10} {'time %':>7}")
+    for rows in row_counts:
+        df = make_catalog(rows)
+        for column in INDEXED_COLUMNS:
+            df[column] = df[column].astype('category')
+        add_derived_columns(df)
+
+        baseline = None
+        for name, build in variants:
+            ms = measure(build, df, repeat)
+            baseline = baseline or ms
+            print(f"{rows:>8} {name:>22} {ms:>10.1f} {100 * ms / baseline:>6.0f}%")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,102 @@
+"""
+Synthetic space_decay.csv generator for benchmarks
+
+Produces a catalog with the same columns as the Space-Track export used by
+the site, so loaders and endpoints can be timed at sizes the real file
+does not reach.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MU_EARTH = 398600.4418
+EARTH_RADIUS_KM = 6378.137
+
+
+def make_catalog(rows, seed=42):
+    """Return a DataFrame with `rows` synthetic catalog entries"""
+    rng = np.random.default_rng(seed)
+
+    # Orbital elements
+    mean_motion = rng.uniform(1, 16, rows)
+    period = 1440 / mean_motion
+    semimajor_axis = (MU_EARTH * (period * 60 / (2 * np.pi)) ** 2) ** (1 / 3)
+    eccentricity = rng.beta(1, 30, rows)
+    apoapsis = semimajor_axis * (1 + eccentricity) - EARTH_RADIUS_KM
+    periapsis = semimajor_axis * (1 - eccentricity) - EARTH_RADIUS_KM
+
+    # Categorical attributes
+    object_type = rng.choice(['DEBRIS', 'PAYLOAD', 'ROCKET BODY', 'TBA'], rows, p=[0.6, 0.25, 0.1, 0.05])
+    rcs_size = rng.choice(np.array(['SMALL', 'MEDIUM', 'LARGE', None], dtype=object), rows, p=[0.5, 0.2, 0.2, 0.1])
+    country_code = rng.choice(np.array(['US', 'CIS', 'PRC', 'FR', 'JPN', 'IND', None], dtype=object), rows)
+    norad_cat_id = rng.permutation(rows) + 1
+    launch_year = rng.integers(1960, 2022, rows)
+    launch_date = [f"{y}-{m:02d}-{d:02d}" for y, m, d in zip(
+        launch_year, rng.integers(1, 13, rows), rng.integers(1, 29, rows))]
+    decay_date = np.where(rng.random(rows) < 0.2, '2021-06-01', None)
+
+    # Object names
+    object_name = np.array([f"COSMOS {i} DEB" for i in rng.integers(1000, 2600, rows)], dtype=object)
+    payload = object_type == 'PAYLOAD'
+    object_name[payload] = [f"STARLINK-{i}" for i in rng.integers(1000, 4000, payload.sum())]
+    rocket = object_type == 'ROCKET BODY'
+    object_name[rocket] = [f"SL-{i} R/B" for i in rng.integers(1, 30, rocket.sum())]
+
+    return pd.DataFrame({
+        'CCSDS_OMM_VERS': '2.0',
+        'COMMENT': 'GENERATED VIA SPACE-TRACK.ORG API',
+        'CREATION_DATE': '2021-11-01T06:46:11',
+        'ORIGINATOR': '18 SPCS',
+        'OBJECT_NAME': object_name,
+        'OBJECT_ID': [f"{y}-{i % 999 + 1:03d}{'ABCDEFGH'[i % 8]}" for i, y in enumerate(launch_year)],
+        'CENTER_NAME': 'EARTH',
+        'REF_FRAME': 'TEME',
+        'TIME_SYSTEM': 'UTC',
+        'MEAN_ELEMENT_THEORY': 'SGP4',
+        'EPOCH': '2021-10-31T18:24:14.123456',
+        'MEAN_MOTION': mean_motion,
+        'ECCENTRICITY': eccentricity,
+        'INCLINATION': rng.uniform(0, 150, rows),
+        'RA_OF_ASC_NODE': rng.uniform(0, 360, rows),
+        'ARG_OF_PERICENTER': rng.uniform(0, 360, rows),
+        'MEAN_ANOMALY': rng.uniform(0, 360, rows),
+        'EPHEMERIS_TYPE': 0,
+        'CLASSIFICATION_TYPE': 'U',
+        'NORAD_CAT_ID': norad_cat_id,
+        'ELEMENT_SET_NO': 999,
+        'REV_AT_EPOCH': rng.integers(0, 90000, rows),
+        'BSTAR': rng.normal(0, 1e-3, rows),
+        'MEAN_MOTION_DOT': rng.normal(0, 1e-5, rows),
+        'MEAN_MOTION_DDOT': 0.0,
+        'SEMIMAJOR_AXIS': semimajor_axis,
+        'PERIOD': period,
+        'APOAPSIS': apoapsis,
+        'PERIAPSIS': periapsis,
+        'OBJECT_TYPE': object_type,
+        'RCS_SIZE': rcs_size,
+        'COUNTRY_CODE': country_code,
+        'LAUNCH_DATE': launch_date,
+        'SITE': 'AFETR',
+        'DECAY_DATE': decay_date,
+        'FILE': 3206094,
+        'GP_ID': np.arange(rows) + 187000000,
+        'TLE_LINE0': ['0 ' + name for name in object_name],
+        'TLE_LINE1': [f"1 {i % 100000:05d}U 21001A   21304.76683013  .00000123  00000-0  12345-3 0  9991" for i in norad_cat_id],
+        'TLE_LINE2': [f"2 {i % 100000:05d}  98.1234 123.4567 0012345 123.4567 236.7890 14.12345678123456" for i in norad_cat_id]
+    })
+
+
+def write_catalog(path, rows, seed=42):
+    """Write a synthetic catalog CSV to `path`"""
+    make_catalog(rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a synthetic space_decay.csv')
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    write_catalog(args.path, args.rows, args.seed)
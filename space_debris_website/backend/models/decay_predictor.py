@@ -1,11 +1,14 @@
 import os
 import joblib
 import numpy as np
-import pandas as pd
 from datetime import datetime
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from utils.catalog import catalog_store
+from utils.compiled_forest import compiled_forest
+from utils.prediction_cache import PredictionCache
+
 class DecayPredictor:
     """
     Class for predicting orbital decay probability of space debris
@@ -44,6 +47,12 @@ class DecayPredictor:
         # Load or train the model
         self.model = self._load_or_train_model()
         self.scaler = self._load_or_create_scaler()
+        
+        # Optional MicroBatcher that coalesces concurrent predict() calls
+        self.batcher = None
+        
+        # Single-object results, dropped whenever the model or scaler is replaced
+        self.cache = PredictionCache()
     
     def _load_or_train_model(self):
         """Load the model from file or train a new one if it doesn't exist"""
@@ -91,34 +100,19 @@ class DecayPredictor:
     def _train_model(self):
         """Train a new decay prediction model using the space debris data"""
         try:
-            # Try multiple possible paths for the data file
-            data_paths = [
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'space_decay.csv'),
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'space_decay.csv'),
-                os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'space_decay.csv')
-            ]
-            
-            df = None
-            for data_path in data_paths:
-                if os.path.exists(data_path):
-                    df = pd.read_csv(data_path)
-                    if df is not None and len(df) > 0:
-                        break
-            
+            # Load the catalog from the shared store
+            df, error = catalog_store.load()
             if df is None:
-                raise FileNotFoundError("Could not find or load data file")
+                raise FileNotFoundError(error or "Could not find or load data file")
             
-            # Create features
-            df['ORBITAL_ENERGY'] = -398600.4418 / (2 * df['SEMIMAJOR_AXIS'])
-            df['ORBITAL_PERIOD'] = 2 * np.pi * np.sqrt(df['SEMIMAJOR_AXIS']**3 / 398600.4418)
-            df['MEAN_VELOCITY'] = np.sqrt(398600.4418 * (2/df['SEMIMAJOR_AXIS'] - 1/df['SEMIMAJOR_AXIS']))
+            # ORBITAL_ENERGY, ORBITAL_PERIOD and MEAN_VELOCITY are derived by the
+            # catalog loader; the shared snapshot is read, never modified
             
             # Create binary target (1 for decayed objects, 0 for active)
-            df['DECAYED'] = (df['DECAY_DATE'].notna()).astype(int)
+            y = df['DECAY_DATE'].notna().astype(int)
             
-            # Select features and target
+            # Select features
             X = df[self.features]
-            y = df['DECAYED']
             
             # Scale features
             X_scaled = self.scaler.fit_transform(X)
@@ -160,17 +154,59 @@ class DecayPredictor:
         try:
             # Convert features to numpy array
             X = np.array([[float(features[f]) for f in self.features]])
+        except Exception as e:
+            print(f"Error making decay prediction: {e}")
+            # Return default probabilities
+            return 0.5, np.array([0.5, 0.5])
+        
+        # Repeated parameter sets are answered without evaluating the forest
+        key = self.cache.key(self, X[0])
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            if self.batcher is not None:
+                # Scored together with whatever other requests are in flight
+                decay_probability, probabilities = self.batcher.submit(X[0])
+            else:
+                decay_probabilities, probabilities = self._evaluate(X)
+                decay_probability, probabilities = decay_probabilities[0], probabilities[0]
+        except Exception as e:
+            print(f"Error making decay prediction: {e}")
+            # Not cached, so the next request asks the model again
+            return 0.5, np.array([0.5, 0.5])
+        
+        result = float(decay_probability), probabilities
+        self.cache.put(key, result)
+        return result
+    
+    def predict_batch(self, X):
+        """
+        Predict the decay probability of many objects with one forest evaluation
+        
+        Args:
+            X (numpy.ndarray): One row of feature values per object, in self.features order
             
-            # Scale features
-            X_scaled = self.scaler.transform(X)
-            
-            # Make prediction
-            probabilities = self.model.predict_proba(X_scaled)[0]
-            decay_probability = float(probabilities[1])  # Probability of decay
-            
-            return decay_probability, probabilities
-            
+        Returns:
+            tuple: (decay probability per object, probabilities with one row per object)
+        """
+        try:
+            return self._evaluate(X)
         except Exception as e:
             print(f"Error making decay prediction: {e}")
             # Return default probabilities
-            return 0.5, np.array([0.5, 0.5]) 
\ No newline at end of file
+            return np.full(len(X), 0.5), np.full((len(X), 2), 0.5)
+    
+    def _evaluate(self, X):
+        """Evaluate the forest like predict_batch, but raise instead of falling back"""
+        # The compiled forest scales and scores in one step, with the
+        # same probabilities as the scaler and forest themselves
+        forest = compiled_forest(self)
+        if forest is not None:
+            probabilities = forest.predict_proba(X)
+        else:
+            probabilities = self.model.predict_proba(self.scaler.transform(X))
+        decay_probabilities = probabilities[:, 1]  # Probability of decay
+        
+        return decay_probabilities, probabilities
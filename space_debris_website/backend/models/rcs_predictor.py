@@ -1,11 +1,14 @@
 import os
 import joblib
 import numpy as np
-import pandas as pd
 from datetime import datetime
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from utils.catalog import catalog_store
+from utils.compiled_forest import compiled_forest
+from utils.prediction_cache import PredictionCache
+
 class RCSPredictor:
     """
     Class for predicting RCS size of space debris based on orbital parameters
@@ -45,6 +48,12 @@ class RCSPredictor:
         # Load or train the model
         self.model = self._load_or_train_model()
         self.scaler = self._load_or_create_scaler()
+        
+        # Optional MicroBatcher that coalesces concurrent predict() calls
+        self.batcher = None
+        
+        # Single-object results, dropped whenever the model or scaler is replaced
+        self.cache = PredictionCache()
     
     def _load_or_train_model(self):
         """Load the model from file or train a new one if it doesn't exist"""
@@ -92,53 +101,24 @@ class RCSPredictor:
     def _train_model(self):
         """Train a new model using the space debris data"""
         try:
-            # Try multiple possible paths for the data file
-            data_paths = [
-                # Path relative to models directory
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'space_decay.csv'),
-                # Path relative to backend directory
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'space_decay.csv'),
-                # Root level path
-                os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'space_decay.csv'),
-                # Absolute path to project root + data
-                os.path.join(os.path.abspath(os.sep), 'Users', 'vishe', 'OneDrive', 'Desktop', 'project this', 'space_decay.csv'),
-                # Absolute path to project data directory
-                os.path.join(os.path.abspath(os.sep), 'Users', 'vishe', 'OneDrive', 'Desktop', 'project this', 'space_debris_website', 'data', 'space_decay.csv')
-            ]
-            
-            df = None
-            for data_path in data_paths:
-                print(f"Trying to load data from {data_path}")
-                if os.path.exists(data_path):
-                    print(f"Found data file at {data_path}")
-                    df = pd.read_csv(data_path)
-                    if df is not None and len(df) > 0:
-                        print(f"Successfully loaded {len(df)} rows from {data_path}")
-                        break
-            
+            # Load the catalog from the shared store
+            df, error = catalog_store.load()
             if df is None:
-                print("Could not find or load data file from any of the possible paths")
-                raise FileNotFoundError("Could not find or load data file")
+                raise FileNotFoundError(error or "Could not find or load data file")
                 
             # Filter debris objects with known RCS size
             df = df[df['OBJECT_TYPE'] == 'DEBRIS']
             df = df.dropna(subset=['RCS_SIZE'])
             print(f"Filtered to {len(df)} debris objects with known RCS size")
             
-            # Create CENT_FOCUS_DIST feature
-            df['CENT_FOCUS_DIST'] = df['SEMIMAJOR_AXIS'] * df['ECCENTRICITY']
-            
-            # Create OBJECT_AGE feature (current year - launch year)
-            current_year = datetime.now().year
-            df['OBJECT_AGE'] = current_year - pd.to_datetime(df['LAUNCH_DATE']).dt.year
+            # CENT_FOCUS_DIST and OBJECT_AGE are derived by the catalog loader
             
             # Map RCS_SIZE to numeric values
             size_map = {'SMALL': 1, 'MEDIUM': 2, 'LARGE': 3}
-            df['RCS_SIZE'] = df['RCS_SIZE'].map(size_map)
             
             # Select features and target
             X = df[self.features]
-            y = df['RCS_SIZE']
+            y = df['RCS_SIZE'].astype(str).map(size_map)
             
             # Scale features
             X_scaled = self.scaler.fit_transform(X)
@@ -182,29 +162,69 @@ class RCSPredictor:
         try:
             # Convert features to numpy array
             X = np.array([[float(features[f]) for f in self.features]])
+        except Exception as e:
+            print(f"Error making prediction: {e}")
+            # Return unknown with equal probabilities
+            return 'UNKNOWN', np.array([0.33, 0.33, 0.34])
+        
+        # Repeated parameter sets are answered without evaluating the forest
+        key = self.cache.key(self, X[0])
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            if self.batcher is not None:
+                # Scored together with whatever other requests are in flight
+                predicted_class, probabilities = self.batcher.submit(X[0])
+            else:
+                predicted_classes, probabilities = self._evaluate(X)
+                predicted_class, probabilities = predicted_classes[0], probabilities[0]
+        except Exception as e:
+            print(f"Error making prediction: {e}")
+            # Not cached, so the next request asks the model again
+            return 'UNKNOWN', np.array([0.33, 0.33, 0.34])
+        
+        result = predicted_class, probabilities
+        self.cache.put(key, result)
+        return result
+    
+    def predict_batch(self, X):
+        """
+        Predict the RCS size of many objects with one forest evaluation
+        
+        Args:
+            X (numpy.ndarray): One row of feature values per object, in self.features order
             
-            # Scale features
-            X_scaled = self.scaler.transform(X)
-            
-            # Make prediction
-            prediction = self.model.predict(X_scaled)[0]
-            probabilities = self.model.predict_proba(X_scaled)[0]
-            
-            # Map numeric prediction back to class name
-            class_map = {1: 'SMALL', 2: 'MEDIUM', 3: 'LARGE'}
-            predicted_class = class_map.get(prediction, 'UNKNOWN')
-            
-            # Get probability of predicted class
-            max_prob_idx = np.argmax(probabilities)
-            probability = float(probabilities[max_prob_idx])
-            
-            # If probability is too low, mark as unknown
-            if probability < 0.4:
-                return 'UNKNOWN', probabilities
-            
-            return predicted_class, probabilities
-            
+        Returns:
+            tuple: (list of predicted classes, probabilities with one row per object)
+        """
+        try:
+            return self._evaluate(X)
         except Exception as e:
             print(f"Error making prediction: {e}")
             # Return unknown with equal probabilities
-            return 'UNKNOWN', np.array([0.33, 0.33, 0.34]) 
\ No newline at end of file
+            return ['UNKNOWN'] * len(X), np.tile([0.33, 0.33, 0.34], (len(X), 1))
+    
+    def _evaluate(self, X):
+        """Evaluate the forest like predict_batch, but raise instead of falling back"""
+        # The predicted class is the most probable one, so the forest
+        # only has to be evaluated once. The compiled forest scales and
+        # scores in one step, with the same probabilities as the scaler
+        # and forest themselves
+        forest = compiled_forest(self)
+        if forest is not None:
+            probabilities = forest.predict_proba(X)
+        else:
+            probabilities = self.model.predict_proba(self.scaler.transform(X))
+        best = np.argmax(probabilities, axis=1)
+        
+        # Map numeric prediction back to class name
+        class_map = {1: 'SMALL', 2: 'MEDIUM', 3: 'LARGE'}
+        predicted_classes = [class_map.get(c, 'UNKNOWN') for c in self.model.classes_[best].tolist()]
+        
+        # If probability is too low, mark as unknown
+        confident = probabilities[np.arange(len(best)), best] >= 0.4
+        predicted_classes = [c if ok else 'UNKNOWN' for c, ok in zip(predicted_classes, confident.tolist())]
+        
+        return predicted_classes, probabilities
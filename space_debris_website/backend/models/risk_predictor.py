@@ -6,6 +6,10 @@ from datetime import datetime
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from utils.catalog import catalog_store
+from utils.compiled_forest import compiled_forest
+from utils.prediction_cache import PredictionCache
+
 class RiskPredictor:
     """
     Class for predicting collision risk level of space debris
@@ -45,6 +49,12 @@ class RiskPredictor:
         # Load or train the model
         self.model = self._load_or_train_model()
         self.scaler = self._load_or_create_scaler()
+        
+        # Optional MicroBatcher that coalesces concurrent predict() calls
+        self.batcher = None
+        
+        # Single-object results, dropped whenever the model or scaler is replaced
+        self.cache = PredictionCache()
     
     def _load_or_train_model(self):
         """Load the model from file or train a new one if it doesn't exist"""
@@ -92,35 +102,20 @@ class RiskPredictor:
     def _train_model(self):
         """Train a new risk prediction model using the space debris data"""
         try:
-            # Try multiple possible paths for the data file
-            data_paths = [
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'space_decay.csv'),
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'data', 'space_decay.csv'),
-                os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'space_decay.csv')
-            ]
-            
-            df = None
-            for data_path in data_paths:
-                if os.path.exists(data_path):
-                    df = pd.read_csv(data_path)
-                    if df is not None and len(df) > 0:
-                        break
-            
+            # Load the catalog from the shared store
+            df, error = catalog_store.load()
             if df is None:
-                raise FileNotFoundError("Could not find or load data file")
+                raise FileNotFoundError(error or "Could not find or load data file")
             
-            # Create features
-            df['ORBITAL_ENERGY'] = -398600.4418 / (2 * df['SEMIMAJOR_AXIS'])
-            df['ORBITAL_PERIOD'] = 2 * np.pi * np.sqrt(df['SEMIMAJOR_AXIS']**3 / 398600.4418)
-            df['MEAN_VELOCITY'] = np.sqrt(398600.4418 * (2/df['SEMIMAJOR_AXIS'] - 1/df['SEMIMAJOR_AXIS']))
+            # ORBITAL_ENERGY, ORBITAL_PERIOD and MEAN_VELOCITY are derived by the
+            # catalog loader; the shared snapshot is read, never modified
             
             # Create risk level target (0: LOW, 1: MEDIUM, 2: HIGH)
             # This is a simplified example - in reality, you would use actual collision risk data
-            df['RISK_LEVEL'] = pd.qcut(df['MEAN_MOTION'], q=3, labels=[0, 1, 2])
+            y = pd.qcut(df['MEAN_MOTION'], q=3, labels=[0, 1, 2])
             
-            # Select features and target
+            # Select features
             X = df[self.features]
-            y = df['RISK_LEVEL']
             
             # Scale features
             X_scaled = self.scaler.fit_transform(X)
@@ -162,20 +157,64 @@ class RiskPredictor:
         try:
             # Convert features to numpy array
             X = np.array([[float(features[f]) for f in self.features]])
+        except Exception as e:
+            print(f"Error making risk prediction: {e}")
+            # Return default risk level and probabilities
+            return 'MEDIUM', np.array([0.33, 0.34, 0.33])
+        
+        # Repeated parameter sets are answered without evaluating the forest
+        key = self.cache.key(self, X[0])
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            if self.batcher is not None:
+                # Scored together with whatever other requests are in flight
+                risk_level, probabilities = self.batcher.submit(X[0])
+            else:
+                risk_levels, probabilities = self._evaluate(X)
+                risk_level, probabilities = risk_levels[0], probabilities[0]
+        except Exception as e:
+            print(f"Error making risk prediction: {e}")
+            # Not cached, so the next request asks the model again
+            return 'MEDIUM', np.array([0.33, 0.34, 0.33])
+        
+        result = risk_level, probabilities
+        self.cache.put(key, result)
+        return result
+    
+    def predict_batch(self, X):
+        """
+        Predict the collision risk level of many objects with one forest evaluation
+        
+        Args:
+            X (numpy.ndarray): One row of feature values per object, in self.features order
             
-            # Scale features
-            X_scaled = self.scaler.transform(X)
-            
-            # Make prediction
-            risk_level_idx = self.model.predict(X_scaled)[0]
-            probabilities = self.model.predict_proba(X_scaled)[0]
-            
-            # Map numeric prediction to risk level
-            risk_level = self.risk_levels[risk_level_idx]
-            
-            return risk_level, probabilities
-            
+        Returns:
+            tuple: (list of risk levels, probabilities with one row per object)
+        """
+        try:
+            return self._evaluate(X)
         except Exception as e:
             print(f"Error making risk prediction: {e}")
             # Return default risk level and probabilities
-            return 'MEDIUM', np.array([0.33, 0.34, 0.33]) 
\ No newline at end of file
+            return ['MEDIUM'] * len(X), np.tile([0.33, 0.34, 0.33], (len(X), 1))
+    
+    def _evaluate(self, X):
+        """Evaluate the forest like predict_batch, but raise instead of falling back"""
+        # The predicted level is the most probable one, so the forest
+        # only has to be evaluated once. The compiled forest scales and
+        # scores in one step, with the same probabilities as the scaler
+        # and forest themselves
+        forest = compiled_forest(self)
+        if forest is not None:
+            probabilities = forest.predict_proba(X)
+        else:
+            probabilities = self.model.predict_proba(self.scaler.transform(X))
+        risk_level_idx = self.model.classes_[np.argmax(probabilities, axis=1)]
+        
+        # Map numeric prediction to risk level
+        risk_levels = [self.risk_levels[i] for i in risk_level_idx.tolist()]
+        
+        return risk_levels, probabilities
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+# Dimensions and measures of the aggregate cube
+CUBE_DIMENSIONS = ['OBJECT_TYPE', 'RCS_SIZE', 'COUNTRY_CODE']
+CUBE_METRICS = ['ECCENTRICITY', 'INCLINATION', 'PERIOD']
+
+
+class AggregateCube:
+    """
+    Pre-aggregated counts and orbital statistics for one catalog snapshot
+
+    The catalog is grouped once by (OBJECT_TYPE, RCS_SIZE, COUNTRY_CODE).
+    Each cell holds the row count, the non-null count, sum, min and max of
+    every metric, and the launch date range. Ingested deltas update the
+    cells instead of regrouping the catalog. Totals, per-dimension counts and
+    filtered statistics are then reduced from a few hundred cells instead of
+    the raw rows. Missing dimension values are kept as their own cells (code
+    -1) so totals still include those rows.
+    """
+
+    def __init__(self, df):
+        self._set_cells(df, self._aggregate(df))
+
+    @staticmethod
+    def _aggregate(df, rows=None):
+        """Per-cell count, metric n/sum/min/max and launch range, indexed by cell codes"""
+        frame = df if rows is None else df.iloc[rows]
+        codes = [frame[dim].cat.codes.to_numpy() for dim in CUBE_DIMENSIONS]
+
+        columns = list(CUBE_METRICS)
+        if 'LAUNCH_DATE' in frame.columns:
+            columns.append('LAUNCH_DATE')
+        grouped = frame[columns].groupby(codes, sort=True)
+
+        cells = pd.DataFrame({'count': grouped.size()})
+        for metric in CUBE_METRICS:
+            column = grouped[metric]
+            cells[f"{metric}_n"] = column.count()
+            cells[f"{metric}_sum"] = column.sum()
+            cells[f"{metric}_min"] = column.min()
+            cells[f"{metric}_max"] = column.max()
+        if 'LAUNCH_DATE' in frame.columns:
+            cells['launch_min'] = grouped['LAUNCH_DATE'].min()
+            cells['launch_max'] = grouped['LAUNCH_DATE'].max()
+        return cells
+
+    def _set_cells(self, df, cells):
+        """Expose the cell table as the flat arrays the queries work on"""
+        self.cells = cells
+        self.categories = {dim: list(df[dim].cat.categories) for dim in CUBE_DIMENSIONS}
+        self.cell_codes = {
+            dim: cells.index.get_level_values(i).to_numpy()
+            for i, dim in enumerate(CUBE_DIMENSIONS)
+        }
+        self.count = cells['count'].to_numpy()
+
+        self.metrics = {}
+        for metric in CUBE_METRICS:
+            self.metrics[metric] = {
+                'n': cells[f"{metric}_n"].to_numpy(),
+                'sum': cells[f"{metric}_sum"].to_numpy(),
+                'min': cells[f"{metric}_min"].to_numpy(),
+                'max': cells[f"{metric}_max"].to_numpy()
+            }
+
+        if 'launch_min' in cells.columns:
+            self.launch_min = cells['launch_min'].to_numpy()
+            self.launch_max = cells['launch_max'].to_numpy()
+        else:
+            self.launch_min = self.launch_max = None
+
+    def apply_change(self, old_df, df, change):
+        """
+        Derive the cube of the next snapshot from this one
+
+        Counts and sums subtract the removed rows and add the new ones. A
+        minimum or maximum only has to be recomputed from the rows when a
+        removed row held it; everywhere else it combines with the new rows.
+
+        Args:
+            old_df (DataFrame): This snapshot's frame
+            df (DataFrame): The next snapshot's frame
+            change (RowChange): How rows of old_df map onto df
+
+        Returns:
+            AggregateCube: cube over df
+        """
+        old = self.cells
+        removed = self._aggregate(old_df, change.removed)
+        added = self._aggregate(df, change.added)
+
+        # Category codes only ever grow, so cell codes stay comparable
+        cell_index = old.index.union(added.index)
+        old = old.reindex(cell_index)
+        removed = removed.reindex(cell_index)
+        added = added.reindex(cell_index)
+
+        cells = pd.DataFrame(index=cell_index)
+        additive = ['count'] + [f"{m}_{s}" for m in CUBE_METRICS for s in ('n', 'sum')]
+        for column in additive:
+            cells[column] = old[column].fillna(0) - removed[column].fillna(0) + added[column].fillna(0)
+        cells['count'] = cells['count'].astype(np.int64)
+        for metric in CUBE_METRICS:
+            cells[f"{metric}_n"] = cells[f"{metric}_n"].astype(np.int64)
+
+        extremes = [(f"{m}_min", f"{m}_max") for m in CUBE_METRICS]
+        if 'launch_min' in old.columns:
+            extremes.append(('launch_min', 'launch_max'))
+
+        stale = np.zeros(len(cell_index), dtype=bool)
+        for low, high in extremes:
+            stale |= (removed[low] == old[low]).to_numpy() | (removed[high] == old[high]).to_numpy()
+            cells[low] = pd.concat([old[low], added[low]], axis=1).min(axis=1)
+            cells[high] = pd.concat([old[high], added[high]], axis=1).max(axis=1)
+
+        cells = cells[cells['count'] > 0]
+        stale_cells = cell_index[stale].intersection(cells.index)
+        if len(stale_cells):
+            # Recompute only the rows of cells that lost an extreme value
+            row_cells = pd.MultiIndex.from_arrays(
+                [df[dim].cat.codes.to_numpy() for dim in CUBE_DIMENSIONS]
+            )
+            rows = np.flatnonzero(row_cells.isin(stale_cells))
+            fresh = self._aggregate(df, rows)
+            for low, high in extremes:
+                cells.loc[stale_cells, low] = fresh.loc[stale_cells, low]
+                cells.loc[stale_cells, high] = fresh.loc[stale_cells, high]
+
+        cube = AggregateCube.__new__(AggregateCube)
+        cube._set_cells(df, cells)
+        return cube
+
+    def _cell_mask(self, filters=None):
+        """Boolean mask over cells matching every dimension == value filter"""
+        mask = np.ones(len(self.count), dtype=bool)
+        for dim, value in (filters or {}).items():
+            if not value:
+                continue
+            if value not in self.categories[dim]:
+                return np.zeros(len(self.count), dtype=bool)
+            mask &= self.cell_codes[dim] == self.categories[dim].index(value)
+        return mask
+
+    def total(self, filters=None):
+        """Number of objects matching the filters"""
+        return int(self.count[self._cell_mask(filters)].sum())
+
+    def counts_by(self, dim, filters=None):
+        """
+        Object counts per value of one dimension, largest first
+
+        Returns:
+            list: (value, count) pairs, excluding missing values and zero counts
+        """
+        mask = self._cell_mask(filters) & (self.cell_codes[dim] >= 0)
+        counts = np.bincount(
+            self.cell_codes[dim][mask],
+            weights=self.count[mask],
+            minlength=len(self.categories[dim])
+        ).astype(np.int64)
+        order = np.argsort(-counts, kind='stable')
+        return [(self.categories[dim][i], int(counts[i])) for i in order if counts[i] > 0]
+
+    def metric_summary(self, metric, filters=None):
+        """Min, max and mean of one metric over the matching objects"""
+        stats = self.metrics[metric]
+        mask = self._cell_mask(filters) & (stats['n'] > 0)
+        n = stats['n'][mask].sum()
+        if n == 0:
+            return {'min': None, 'max': None, 'mean': None}
+        return {
+            'min': float(stats['min'][mask].min()),
+            'max': float(stats['max'][mask].max()),
+            'mean': float(stats['sum'][mask].sum() / n)
+        }
+
+    def launch_date_range(self, filters=None):
+        """Earliest and latest launch date of the matching objects"""
+        if self.launch_min is None:
+            return {'min': None, 'max': None}
+        mask = self._cell_mask(filters)
+        earliest = pd.Series(self.launch_min[mask]).dropna()
+        latest = pd.Series(self.launch_max[mask]).dropna()
+        return {
+            'min': earliest.min() if len(earliest) else None,
+            'max': latest.max() if len(latest) else None
+        }
+
+    def pivot(self, row_dim, col_dim, filters=None):
+        """
+        Cross-tabulate object counts between two dimensions
+
+        Only values that occur together with a non-missing value of the other
+        dimension are included, matching pandas.pivot_table.
+
+        Returns:
+            tuple: (row values, column values, 2-D count array)
+        """
+        rows = self.cell_codes[row_dim]
+        cols = self.cell_codes[col_dim]
+        mask = self._cell_mask(filters) & (rows >= 0) & (cols >= 0) & (self.count > 0)
+
+        n_rows = len(self.categories[row_dim])
+        n_cols = len(self.categories[col_dim])
+        table = np.bincount(
+            rows[mask] * n_cols + cols[mask],
+            weights=self.count[mask],
+            minlength=n_rows * n_cols
+        ).astype(np.int64).reshape(n_rows, n_cols)
+
+        present_rows = np.flatnonzero(table.sum(axis=1))
+        present_cols = np.flatnonzero(table.sum(axis=0))
+        return (
+            [self.categories[row_dim][i] for i in present_rows],
+            [self.categories[col_dim][i] for i in present_cols],
+            table[np.ix_(present_rows, present_cols)]
+        )
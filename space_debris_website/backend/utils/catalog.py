@@ -0,0 +1,321 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import AggregateCube
+from utils.catalog_index import INDEXED_COLUMNS, CatalogIndex
+from utils.columnar_cache import read_catalog_csv
+from utils.ingest import append_delta, apply_delta, journal_path, read_deltas
+from utils.name_search import NameSearchIndex
+
+# Candidate locations for the catalog CSV, checked in order.
+# SPACE_DECAY_CSV can be set in the environment to point at a specific file.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATHS = [
+    # Project data directory
+    os.path.join(BACKEND_DIR, '..', 'data', 'space_decay.csv'),
+    # Data directory inside the backend
+    os.path.join(BACKEND_DIR, 'data', 'space_decay.csv'),
+    # Root level path
+    os.path.join(BACKEND_DIR, '..', '..', 'space_decay.csv'),
+    # Relative to the working directory
+    os.path.join(os.getcwd(), 'space_debris_website', 'data', 'space_decay.csv')
+]
+
+# Earth radius in km, used to derive altitude from the semimajor axis
+EARTH_RADIUS_KM = 6371
+
+# Earth's gravitational parameter in km^3/s^2
+EARTH_MU = 398600.4418
+
+
+def add_derived_columns(df):
+    """
+    Add the computed columns the views and predictors use, in one pass
+
+    Every column is derived from plain arrays, so the same function serves
+    the full load and each delta applied on top of it.
+    """
+    semimajor_axis = df['SEMIMAJOR_AXIS'].to_numpy(dtype=float)
+    launch_year = pd.to_datetime(df['LAUNCH_DATE'], format='%Y-%m-%d', errors='coerce').dt.year.to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        derived = {
+            # Altitude above the surface from the semimajor axis
+            'ALTITUDE_KM': semimajor_axis - EARTH_RADIUS_KM,
+            # Orbital period in hours
+            'PERIOD_HOURS': df['PERIOD'].to_numpy(dtype=float) / 60,
+            # Specific orbital energy, period (seconds) and mean speed from the semimajor axis
+            'ORBITAL_ENERGY': -EARTH_MU / (2 * semimajor_axis),
+            'ORBITAL_PERIOD': 2 * np.pi * np.sqrt(semimajor_axis ** 3 / EARTH_MU),
+            'MEAN_VELOCITY': np.sqrt(EARTH_MU / semimajor_axis),
+            # Distance between the orbit's centre and the focus (Earth)
+            'CENT_FOCUS_DIST': semimajor_axis * df['ECCENTRICITY'].to_numpy(dtype=float),
+            # Years since launch
+            'OBJECT_AGE': datetime.now().year - launch_year
+        }
+
+    for column, values in derived.items():
+        df[column] = values
+    return df
+
+
+class CatalogSnapshot:
+    """
+    A single, immutable version of the space debris catalog.
+
+    Handlers must treat ``df`` as read-only: filter or copy it before adding
+    columns, since the same frame is shared by every request in the process.
+    """
+
+    def __init__(self, df, version, path, mtime, size):
+        self.df = df
+        self.version = version
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.loaded_at = datetime.now().isoformat()
+        self._derived = {}
+        # One lock per structure, so a slow build only holds up its own users
+        self._derived_locks = {}
+        self._derived_lock = threading.Lock()
+
+    @property
+    def signature(self):
+        """File identity this snapshot was parsed from"""
+        return (self.path, self.mtime, self.size)
+
+    def derived(self, name, builder):
+        """Return a structure derived from this snapshot, building it on first use"""
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                lock = self._derived_locks.setdefault(name, threading.Lock())
+            with lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = builder()
+                    self._derived[name] = value
+        return value
+
+    def built(self, name):
+        """Return a derived structure if it has already been built, else None"""
+        return self._derived.get(name)
+
+    @property
+    def index(self):
+        """Inverted indexes over the categorical columns"""
+        return self.derived('index', lambda: CatalogIndex(self.df))
+
+    @property
+    def cube(self):
+        """Aggregate cube over object type, RCS size and country"""
+        return self.derived('cube', lambda: AggregateCube(self.df))
+
+    @property
+    def name_search(self):
+        """Prefix and trigram index over OBJECT_NAME, built on first search"""
+        return self.derived('name_search', lambda: NameSearchIndex(self.df))
+
+
+class CatalogStore:
+    """
+    Process-wide holder of the current catalog snapshot.
+
+    The CSV is parsed once and re-parsed only when its mtime or size changes.
+    Deltas appended to the journal next to it are applied on top, each one
+    producing the next snapshot version. A reload or delta builds a complete
+    new snapshot and then swaps the reference, so requests already holding
+    the previous snapshot keep a consistent view.
+    """
+
+    def __init__(self, data_paths=None):
+        self.data_paths = data_paths or DATA_PATHS
+        self._resolved = None
+        self._snapshot = None
+        self._version = 0
+        self._journal_offset = 0
+        self._lock = threading.Lock()
+
+    def resolve_path(self):
+        """
+        Return the catalog path, or None if no candidate exists
+
+        The candidates are probed once; later calls only check that the
+        resolved file is still there (and that SPACE_DECAY_CSV is unchanged).
+        """
+        override = os.environ.get('SPACE_DECAY_CSV')
+        resolved = self._resolved
+        if resolved is not None and resolved[0] == override and os.path.exists(resolved[1]):
+            return resolved[1]
+
+        candidates = [override] if override else []
+        for path in candidates + self.data_paths:
+            if os.path.exists(path):
+                self._resolved = (override, os.path.abspath(path))
+                return self._resolved[1]
+        return None
+
+    def _read(self, path):
+        """Parse the catalog CSV and add the computed columns every view uses"""
+        print(f"Loading catalog from: {path}")
+        df = read_catalog_csv(path, categorical=INDEXED_COLUMNS)
+        if len(df) == 0:
+            raise ValueError("Data file is empty")
+
+        add_derived_columns(df)
+
+        print(f"Successfully loaded {len(df)} rows of data")
+        return df
+
+    @staticmethod
+    def _journal_size(path):
+        try:
+            return os.path.getsize(journal_path(path))
+        except OSError:
+            return 0
+
+    def snapshot(self):
+        """
+        Return the current catalog snapshot, reloading it if the file changed
+
+        Raises:
+            FileNotFoundError: if no catalog file exists and nothing was loaded before
+        """
+        current = self._snapshot
+        path = self.resolve_path()
+        if path is None:
+            if current is not None:
+                return current
+            raise FileNotFoundError("Data file not found")
+
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        if (current is not None and current.signature == signature
+                and self._journal_size(path) == self._journal_offset):
+            return current
+
+        with self._lock:
+            return self._refresh(path, signature)[0]
+
+    def _refresh(self, path, signature):
+        """
+        Bring the snapshot up to date with the CSV and its delta journal
+
+        Must be called with the lock held.
+
+        Returns:
+            tuple: (CatalogSnapshot, {journal offset: summary} of applied deltas)
+        """
+        current = self._snapshot
+        journal_size = self._journal_size(path)
+        # A truncated journal means the deltas were folded into a new CSV
+        if current is None or current.signature != signature or journal_size < self._journal_offset:
+            try:
+                df = self._read(path)
+            except Exception as e:
+                if current is not None:
+                    print(f"Error reloading catalog, keeping version {current.version}: {e}")
+                    return current, {}
+                raise
+            self._version += 1
+            current = CatalogSnapshot(df, self._version, *signature)
+            # Build the indexes and aggregates before publishing the snapshot
+            current.index.object_id_index
+            current.cube
+            self._snapshot = current
+            self._journal_offset = 0
+
+        summaries = {}
+        if journal_size > self._journal_offset:
+            for offset, delta in read_deltas(journal_path(path), self._journal_offset):
+                if delta is not None:
+                    try:
+                        current, summaries[offset] = self._apply(current, delta)
+                    except Exception as e:
+                        # Skipped rather than retried, so one bad line cannot stall every worker
+                        print(f"Skipping catalog delta ending at offset {offset}: {e}")
+                self._journal_offset = offset
+            self._snapshot = current
+        return current, summaries
+
+    def _apply(self, current, delta):
+        """Build the snapshot that follows current once a delta is applied"""
+        df, change, summary = apply_delta(current.df, current.index, delta)
+        add_derived_columns(df)
+
+        self._version += 1
+        snapshot = CatalogSnapshot(df, self._version, *current.signature)
+        # Carry the indexes and aggregates forward instead of rebuilding them
+        snapshot.derived('index', lambda: current.index.apply_change(df, change))
+        snapshot.derived('cube', lambda: current.cube.apply_change(current.df, df, change))
+        # The name index is built on the first search; once it exists, keep it
+        name_search = current.built('name_search')
+        if name_search is not None:
+            snapshot.derived('name_search', lambda: name_search.apply_change(df, change))
+        print(f"Applied catalog delta as version {snapshot.version}: {summary}")
+        return snapshot, summary
+
+    def ingest(self, delta):
+        """
+        Record a delta in the journal and apply it to the catalog
+
+        The delta is applied before it is journaled, so one that cannot be
+        applied is never recorded. Other workers pick it up from the journal
+        on their next request, so only this one pays for applying it right
+        away.
+
+        Args:
+            delta (dict): Validated delta from parse_delta
+
+        Returns:
+            tuple: (new CatalogSnapshot, summary counts)
+        """
+        path = self.resolve_path()
+        if path is None:
+            raise FileNotFoundError("Data file not found")
+
+        with self._lock:
+            stat = os.stat(path)
+            signature = (path, stat.st_mtime_ns, stat.st_size)
+            current, _ = self._refresh(path, signature)
+            snapshot, summary = self._apply(current, delta)
+            start, offset = append_delta(journal_path(path), delta)
+            if start == self._journal_offset:
+                self._snapshot = snapshot
+                self._journal_offset = offset
+                return snapshot, summary
+            # Another process appended first; replay its deltas and this one in journal order
+            snapshot, summaries = self._refresh(path, signature)
+            return snapshot, summaries.get(offset)
+
+    def load_snapshot(self):
+        """
+        Load the current snapshot without raising
+
+        Returns:
+            tuple: (CatalogSnapshot or None, error message or None)
+        """
+        try:
+            return self.snapshot(), None
+        except Exception as e:
+            error_msg = f"Error loading data: {str(e)}"
+            print(error_msg)
+            return None, error_msg
+
+    def load(self):
+        """
+        Load the catalog for callers that only need the frame
+
+        Returns:
+            tuple: (DataFrame or None, error message or None)
+        """
+        snapshot, error = self.load_snapshot()
+        return (snapshot.df if snapshot is not None else None), error
+
+
+# Shared by every blueprint and predictor in the process
+catalog_store = CatalogStore()
@@ -0,0 +1,344 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# Columns that are dictionary-encoded and indexed for equality filters
+INDEXED_COLUMNS = ['OBJECT_TYPE', 'RCS_SIZE', 'COUNTRY_CODE']
+
+# Numeric columns with sorted indexes for range filters
+RANGE_COLUMNS = ['PERIAPSIS', 'APOAPSIS', 'INCLINATION', 'PERIOD', 'ALTITUDE_KM']
+
+EMPTY_ROWS = np.empty(0, dtype=np.intp)
+
+INT64 = np.iinfo(np.int64)
+
+
+def norad_key(key):
+    """
+    NORAD catalog number a lookup key stands for
+
+    Returns:
+        int or None: the number, or None if the key is not an ASCII digit
+            string or integer that fits in int64
+    """
+    if isinstance(key, str):
+        key = key.strip()
+        if not (key.isascii() and key.isdecimal()):
+            return None
+    elif isinstance(key, bool) or not isinstance(key, (int, np.integer)):
+        return None
+    try:
+        key = int(key)
+    except (ValueError, OverflowError):
+        return None
+    return key if INT64.min <= key <= INT64.max else None
+
+
+def intersect_sorted(a, b):
+    """
+    Intersect two sorted arrays of unique row ids
+
+    Binary-searches the smaller array into the larger one, so the cost is
+    O(len(small) * log(len(large))) rather than a scan over both.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return EMPTY_ROWS
+    positions = np.searchsorted(b, a)
+    positions[positions == len(b)] = 0
+    return a[b[positions] == a]
+
+
+def insert_sorted(order, keys, rows, row_keys):
+    """
+    Insert rows into an ordering sorted by (key, row position)
+
+    Args:
+        order (numpy.ndarray): Row positions sorted by key, ties by position
+        keys (numpy.ndarray): Key of every row, indexed by row position
+        rows (numpy.ndarray): Row positions to insert
+        row_keys (numpy.ndarray): Their keys
+
+    Returns:
+        numpy.ndarray: the merged ordering, as a stable argsort of keys would give
+    """
+    if len(rows) == 0:
+        return order
+    by_key = np.lexsort((rows, row_keys))
+    rows, row_keys = rows[by_key], row_keys[by_key]
+
+    sorted_keys = keys[order]
+    at = np.searchsorted(sorted_keys, row_keys, side='left')
+    end = np.searchsorted(sorted_keys, row_keys, side='right')
+    # Equal keys already present are ordered by row position
+    for i in np.flatnonzero(end > at):
+        at[i] += np.searchsorted(order[at[i]:end[i]], rows[i])
+    return np.insert(order, at, rows)
+
+
+class CatalogIndex:
+    """
+    Inverted indexes over the categorical columns of one catalog snapshot
+
+    For every value of every indexed column the index holds the sorted array
+    of row positions with that value, so equality filters become lookups and
+    intersections instead of full-column scans. It also keeps the rows sorted
+    by NORAD_CAT_ID for keyset pagination and NORAD lookups, a hash index on
+    OBJECT_ID for designator lookups, and sorted copies of the orbital
+    columns so range filters are answered by binary search.
+    """
+
+    def __init__(self, df, columns=None):
+        self.row_count = len(df)
+        self.postings = {}
+        for column in columns or INDEXED_COLUMNS:
+            self.postings[column] = self._build_postings(df[column])
+
+        # Row positions ordered by NORAD id, for keyset pagination
+        self.norad_ids = df['NORAD_CAT_ID'].to_numpy()
+        self.norad_order = np.argsort(self.norad_ids, kind='stable')
+        self.norad_sorted = self.norad_ids[self.norad_order]
+
+        # International designators, hash-indexed on first lookup
+        self.object_ids = df['OBJECT_ID']
+
+        # Sorted indexes for range filters; missing values are left out
+        self.range_values = {}
+        self.range_order = {}
+        self.range_sorted = {}
+        for column in RANGE_COLUMNS:
+            values = df[column].to_numpy(dtype=np.float64)
+            order = np.argsort(values, kind='stable')
+            order = order[~np.isnan(values[order])]
+            self.range_values[column] = values
+            self.range_order[column] = order
+            self.range_sorted[column] = values[order]
+
+    def apply_change(self, df, change):
+        """
+        Derive the index of the next snapshot from this one
+
+        Rows that were dropped or replaced are removed from every structure,
+        surviving positions are shifted down past the dropped rows, and the
+        replaced and inserted rows are merged in. Sorted structures are
+        updated by insertion rather than re-sorted.
+
+        Args:
+            df (DataFrame): The next snapshot's frame
+            change (RowChange): How rows of this snapshot map onto it
+
+        Returns:
+            CatalogIndex: index over df
+        """
+        index = CatalogIndex.__new__(CatalogIndex)
+        index.row_count = len(df)
+        kept = change.kept
+        added = change.added
+
+        index.postings = {}
+        for column, postings in self.postings.items():
+            codes = df[column].cat.codes.to_numpy()[added]
+            updated = {}
+            for code, value in enumerate(df[column].cat.categories):
+                rows = postings.get(value, EMPTY_ROWS)
+                rows = change.remap[rows[kept[rows]]]
+                new_rows = added[codes == code]
+                if len(new_rows):
+                    rows = np.insert(rows, np.searchsorted(rows, new_rows), new_rows)
+                updated[value] = rows
+            index.postings[column] = updated
+
+        index.norad_ids = df['NORAD_CAT_ID'].to_numpy()
+        order = change.remap[self.norad_order[kept[self.norad_order]]]
+        index.norad_order = insert_sorted(order, index.norad_ids, added, index.norad_ids[added])
+        index.norad_sorted = index.norad_ids[index.norad_order]
+
+        # Designator lookups are rare next to ingestion, so that hash index
+        # is only rebuilt if the new snapshot is actually queried by OBJECT_ID
+        index.object_ids = df['OBJECT_ID']
+
+        index.range_values = {}
+        index.range_order = {}
+        index.range_sorted = {}
+        for column in RANGE_COLUMNS:
+            values = df[column].to_numpy(dtype=np.float64)
+            order = self.range_order[column]
+            order = change.remap[order[kept[order]]]
+            new_rows = added[~np.isnan(values[added])]
+            order = insert_sorted(order, values, new_rows, values[new_rows])
+            index.range_values[column] = values
+            index.range_order[column] = order
+            index.range_sorted[column] = values[order]
+        return index
+
+    @staticmethod
+    def _build_postings(series):
+        """Map each category to the sorted row positions that hold it"""
+        codes = series.cat.codes.to_numpy()
+        categories = series.cat.categories
+
+        # A stable sort groups rows by code while keeping row order within a group
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        # Missing values (code -1) sort first and are not indexed
+        bounds = np.count_nonzero(codes < 0) + np.concatenate([[0], np.cumsum(counts)])
+
+        return {
+            value: order[bounds[i]:bounds[i + 1]]
+            for i, value in enumerate(categories)
+        }
+
+    @cached_property
+    def object_id_index(self):
+        """Hash index from OBJECT_ID to row position; the last duplicate wins"""
+        series = self.object_ids
+        keep = ~series.duplicated(keep='last').to_numpy() & series.notna().to_numpy()
+        rows = np.flatnonzero(keep)
+        return pd.Index(series.to_numpy()[rows]), rows
+
+    def norad_lookup(self, norad_ids):
+        """
+        Row positions of NORAD ids through the sorted NORAD order
+
+        Returns:
+            numpy.ndarray: last row holding each id, -1 where it is not in the catalog
+        """
+        keys = np.asarray(norad_ids)
+        # Ties are ordered by row position, so a run of duplicates ends at the last row
+        at = np.searchsorted(self.norad_sorted, keys, side='right') - 1
+        found = (at >= 0) & (self.norad_sorted[np.maximum(at, 0)] == keys)
+        return np.where(found, self.norad_order[np.maximum(at, 0)], -1)
+
+    def find_rows(self, ids):
+        """
+        Resolve object identifiers to row positions
+
+        Args:
+            ids (list): NORAD catalog numbers (int or digit strings) or OBJECT_IDs
+
+        Returns:
+            numpy.ndarray: row position for each id, -1 where it is not in the catalog
+        """
+        result = np.full(len(ids), -1, dtype=np.intp)
+        norad_at, norad_keys, object_at, object_keys = [], [], [], []
+        for i, key in enumerate(ids):
+            norad_id = norad_key(key)
+            if norad_id is not None:
+                norad_at.append(i)
+                norad_keys.append(norad_id)
+            else:
+                object_at.append(i)
+                object_keys.append(str(key).strip())
+
+        if norad_keys:
+            result[norad_at] = self.norad_lookup(norad_keys)
+        if object_keys:
+            index, rows = self.object_id_index
+            positions = index.get_indexer(object_keys)
+            found = positions >= 0
+            result[np.asarray(object_at)[found]] = rows[positions[found]]
+        return result
+
+    def range_rows(self, ranges):
+        """
+        Find the rows whose values fall inside every (low, high) range
+
+        The narrowest range is resolved by binary search on its sorted index;
+        the remaining ranges are checked only against those candidates.
+
+        Args:
+            ranges (dict): Column name to (low, high); either bound may be None
+
+        Returns:
+            numpy.ndarray or None: sorted row positions, or None when no range applies
+        """
+        bounds = []
+        for column, (low, high) in ranges.items():
+            if low is None and high is None:
+                continue
+            sorted_values = self.range_sorted[column]
+            start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+            end = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right')
+            bounds.append((max(end - start, 0), column, start, end, low, high))
+
+        if not bounds:
+            return None
+
+        bounds.sort(key=lambda bound: bound[0])
+        _, column, start, end, _, _ = bounds[0]
+        rows = self.range_order[column][start:end]
+        for _, column, _, _, low, high in bounds[1:]:
+            values = self.range_values[column][rows]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            rows = rows[keep]
+        return np.sort(rows)
+
+    def lookup(self, filters, ranges=None):
+        """
+        Find the rows matching every column == value filter and every range
+
+        Args:
+            filters (dict): Column name to required value; empty values are ignored
+            ranges (dict): Column name to (low, high) bounds, see range_rows
+
+        Returns:
+            numpy.ndarray or None: sorted row positions, or None when no filter applies
+        """
+        matches = []
+        for column, value in filters.items():
+            if not value:
+                continue
+            rows = self.postings[column].get(value)
+            if rows is None:
+                return EMPTY_ROWS
+            matches.append(rows)
+
+        if ranges:
+            rows = self.range_rows(ranges)
+            if rows is not None:
+                matches.append(rows)
+
+        if not matches:
+            return None
+
+        # Start from the most selective list so intermediate results stay small
+        matches.sort(key=len)
+        result = matches[0]
+        for rows in matches[1:]:
+            result = intersect_sorted(result, rows)
+        return result
+
+    def page_after(self, after, limit, rows=None):
+        """
+        Return the next keyset page ordered by NORAD_CAT_ID
+
+        Args:
+            after: Last NORAD id of the previous page, or None for the first page
+            limit (int): Maximum number of rows to return
+            rows (numpy.ndarray): Candidate row positions, or None for the whole catalog
+
+        Returns:
+            tuple: (row positions in NORAD order, whether more rows follow)
+        """
+        if rows is None:
+            # Binary search straight to the first id after the cursor
+            start = 0 if after is None else np.searchsorted(self.norad_sorted, after, side='right')
+            page = self.norad_order[start:start + limit]
+            return page, start + limit < self.row_count
+
+        keys = self.norad_ids[rows]
+        if after is not None:
+            later = keys > after
+            rows, keys = rows[later], keys[later]
+        has_more = len(rows) > limit
+        if has_more:
+            # Only the `limit` smallest keys are needed, not a full sort
+            smallest = np.argpartition(keys, limit - 1)[:limit]
+            rows, keys = rows[smallest], keys[smallest]
+        return rows[np.argsort(keys, kind='stable')], has_more
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes so stale sidecars are ignored
+CACHE_FORMAT_VERSION = 2
+MANIFEST_NAME = 'manifest.json'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_root(csv_path):
+    """Directory that holds the sidecars built for a CSV file"""
+    override = os.environ.get('CATALOG_CACHE_DIR')
+    if override:
+        return override
+    directory, name = os.path.split(csv_path)
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}_cache")
+
+
+def _column_file(index):
+    return f"{index:03d}.npy"
+
+
+def _categories_file(index):
+    return f"{index:03d}.categories.json"
+
+
+def write_sidecar(df, directory):
+    """
+    Write a DataFrame as one .npy file per column
+
+    Numeric and boolean columns are stored as-is so they can be memory-mapped.
+    Text columns are dictionary-encoded into int32 codes (-1 for missing) plus
+    a sorted JSON list of the distinct values.
+    """
+    columns = []
+    for index, name in enumerate(df.columns):
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            np.save(os.path.join(directory, _column_file(index)), series.to_numpy())
+            columns.append({'name': name, 'kind': 'numeric'})
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            np.save(os.path.join(directory, _column_file(index)), codes.astype(np.int32))
+            with open(os.path.join(directory, _categories_file(index)), 'w') as f:
+                json.dump([str(value) for value in uniques], f)
+            columns.append({'name': name, 'kind': 'text'})
+
+    manifest = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'rows': len(df),
+        'columns': columns
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f)
+
+
+def read_sidecar(directory, categorical=()):
+    """
+    Load a sidecar written by write_sidecar
+
+    Numeric columns are memory-mapped read-only, so processes that load the
+    same sidecar share the underlying page cache instead of private copies.
+    Text columns named in `categorical` are returned as pandas categoricals
+    built straight from the stored codes.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported sidecar format: {manifest.get('format_version')}")
+
+    data = {}
+    for index, column in enumerate(manifest['columns']):
+        values = np.load(os.path.join(directory, _column_file(index)), mmap_mode='r')
+        if column['kind'] == 'text':
+            with open(os.path.join(directory, _categories_file(index))) as f:
+                categories = json.load(f)
+            if column['name'] in categorical:
+                values = pd.Categorical.from_codes(values, categories)
+            else:
+                # Append NaN so that code -1 (missing) decodes to NaN
+                lookup = np.array(categories + [np.nan], dtype=object)
+                values = lookup[values]
+        data[column['name']] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+def read_catalog_csv(csv_path, categorical=()):
+    """
+    Read the catalog CSV through its columnar sidecar
+
+    The sidecar is keyed by a hash of the CSV contents. It is built on the
+    first read of a given CSV and memory-mapped on every later read; any
+    problem with the sidecar falls back to parsing the CSV directly.
+
+    Args:
+        csv_path (str): Path to the catalog CSV
+        categorical (iterable): Text columns to return as pandas categoricals
+    """
+    root = cache_root(csv_path)
+    digest = file_digest(csv_path)
+    directory = os.path.join(root, digest)
+
+    if os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+        try:
+            df = read_sidecar(directory, categorical)
+            print(f"Loaded catalog sidecar from: {directory}")
+            return df
+        except Exception as e:
+            print(f"Error reading catalog sidecar, falling back to CSV: {e}")
+
+    df = pd.read_csv(csv_path)
+    for column in categorical:
+        df[column] = df[column].astype('category')
+
+    try:
+        os.makedirs(root, exist_ok=True)
+        # Build in a temporary directory and rename it into place, so other
+        # workers never see a half-written sidecar
+        tmp_dir = tempfile.mkdtemp(prefix='.building-', dir=root)
+        try:
+            write_sidecar(df, tmp_dir)
+            os.rename(tmp_dir, directory)
+            print(f"Wrote catalog sidecar to: {directory}")
+            # Re-open through the memory map so this worker shares pages too
+            df = read_sidecar(directory, categorical)
+        except OSError:
+            # Another worker finished first, or the rename failed
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        # Drop sidecars of older CSV versions
+        for name in os.listdir(root):
+            if name != digest and not name.startswith('.building-'):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    except Exception as e:
+        print(f"Could not write catalog sidecar: {e}")
+
+    return df
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+
+# Evaluate fitted forests with CompiledForest instead of scikit-learn
+COMPILE_FORESTS = os.environ.get('PREDICTION_COMPILED_FOREST', '1').lower() not in ('0', 'false', 'no')
+
+# Larger batches go to scikit-learn, whose compiled loop overtakes the
+# vectorized traversal at around a thousand rows
+MAX_COMPILED_ROWS = int(os.environ.get('PREDICTION_COMPILED_MAX_ROWS', 1024))
+
+# Synthetic rows compared against scikit-learn before a compiled forest is used
+SPOT_CHECK_ROWS = 512
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier (and its StandardScaler) packed into flat arrays
+
+    Every node of every tree lives in one set of arrays (split feature,
+    threshold, children, leaf probabilities); leaves point back to
+    themselves. Prediction walks all trees for all rows at once, one level
+    per step, so a single row costs a few dozen NumPy calls instead of a
+    predict_proba call per tree with its input validation. Batches of more
+    than max_rows rows are handed to scikit-learn, which is faster there.
+
+    The arithmetic follows scikit-learn's exactly (features scaled in
+    float64 then cast to float32, per-tree leaf probabilities summed in
+    tree order and divided by the tree count), so the probabilities are
+    identical, not just close.
+    """
+
+    def __init__(self, model, scaler=None, max_rows=MAX_COMPILED_ROWS):
+        """
+        Args:
+            model (RandomForestClassifier): Fitted single-output forest
+            scaler (StandardScaler): Fitted scaler applied before the forest, or None
+            max_rows (int): Largest batch evaluated here rather than by scikit-learn
+        """
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        n_classes = int(model.n_classes_)
+        sizes = np.array([tree.node_count for tree in trees])
+        self.roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        offsets = np.repeat(self.roots, sizes)
+
+        left = np.concatenate([tree.children_left for tree in trees]).astype(np.int64)
+        right = np.concatenate([tree.children_right for tree in trees]).astype(np.int64)
+        leaf = left == -1
+        nodes = np.arange(len(left))
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.empty(2 * len(left), dtype=np.int64)
+        self.children[0::2] = np.where(leaf, nodes, left + offsets)
+        self.children[1::2] = np.where(leaf, nodes, right + offsets)
+        self.feature = np.where(leaf, 0, np.concatenate([tree.feature for tree in trees])).astype(np.int64)
+        self.threshold = np.where(leaf, np.inf, np.concatenate([tree.threshold for tree in trees]))
+        self.value = np.concatenate([tree.value[:, 0, :n_classes] for tree in trees])
+        self.depth = max(tree.max_depth for tree in trees)
+        self.n_features = int(model.n_features_in_)
+        self.classes_ = model.classes_
+
+        self.mean = getattr(scaler, 'mean_', None) if scaler is not None else None
+        self.scale = getattr(scaler, 'scale_', None) if scaler is not None else None
+        if scaler is not None and self.mean is None and self.scale is None:
+            raise ValueError("Scaler is not fitted")
+
+        self.model = model
+        self.scaler = scaler
+        self.max_rows = max_rows
+        self._spot_check()
+
+    def _sklearn_proba(self, X):
+        X_scaled = self.scaler.transform(X) if self.scaler is not None else X
+        return self.model.predict_proba(X_scaled)
+
+    def _spot_check(self):
+        """Refuse to stand in for a model whose output would not match scikit-learn's"""
+        rng = np.random.default_rng(0)
+        X = rng.standard_normal((SPOT_CHECK_ROWS, self.n_features))
+        if self.scale is not None:
+            X = X * self.scale
+        if self.mean is not None:
+            X = X + self.mean
+        if not np.array_equal(self._traverse(X), self._sklearn_proba(X)):
+            raise ValueError("Compiled forest does not match scikit-learn's predict_proba")
+
+    def predict_proba(self, X):
+        """
+        Class probabilities of every row of unscaled features
+
+        Args:
+            X (numpy.ndarray): One row of feature values per object
+
+        Returns:
+            numpy.ndarray: probabilities with one row per object, in classes_ order
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features per row")
+        if len(X) > self.max_rows or not np.isfinite(X).all():
+            # Non-finite values are left to scikit-learn's own missing-value rules (or errors)
+            return self._sklearn_proba(X)
+        return self._traverse(X)
+
+    def _traverse(self, X):
+        """Walk every tree for every row of finite, unscaled features"""
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        flat = X.astype(np.float32).ravel()
+
+        n_rows = len(X)
+        row_start = np.arange(n_rows) * self.n_features
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.depth):
+            go_right = flat[row_start + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+
+        # Summing along the tree axis adds the trees one after another, in
+        # the same order as scikit-learn's accumulation
+        proba = self.value[node].sum(axis=0)
+        proba /= len(self.roots)
+        return proba
+
+
+def compiled_forest(predictor):
+    """
+    CompiledForest of the predictor's current model and scaler
+
+    Compiled once per model; a replaced model or scaler is compiled again.
+
+    Returns:
+        CompiledForest or None: None when disabled or the model cannot be compiled
+            (e.g. not fitted), in which case scikit-learn is used directly
+    """
+    if not COMPILE_FORESTS:
+        return None
+    entry = getattr(predictor, '_compiled', None)
+    if entry is None or entry[0] is not predictor.model or entry[1] is not predictor.scaler:
+        try:
+            forest = CompiledForest(predictor.model, predictor.scaler)
+        except Exception as e:
+            print(f"Not compiling {type(predictor).__name__} forest: {e}")
+            forest = None
+        entry = (predictor.model, predictor.scaler, forest)
+        predictor._compiled = entry
+    return entry[2]
@@ -0,0 +1,95 @@
+import numpy as np
+
+# Bins along each side of a tile
+TILE_SIZE = 64
+
+# Zoom level z splits each axis into 2**z tiles
+MAX_ZOOM = 3
+
+# Views served as tiles: x / y columns and the ranges the tiles cover
+DENSITY_VIEWS = {
+    'period_inclination': {
+        'x': 'PERIOD_HOURS', 'y': 'INCLINATION', 'x_range': (0, 30), 'y_range': (0, 180)
+    },
+    'eccentricity_period': {
+        'x': 'PERIOD_HOURS', 'y': 'ECCENTRICITY', 'x_range': (0, 30), 'y_range': (0, 1)
+    },
+    'inclination_eccentricity': {
+        'x': 'ECCENTRICITY', 'y': 'INCLINATION', 'x_range': (0, 1), 'y_range': (0, 180)
+    }
+}
+
+
+def _bins(values, value_range, bins):
+    """Bin of every value over the range, -1 outside it (the top edge counts as inside)"""
+    low, high = value_range
+    with np.errstate(invalid='ignore'):
+        inside = (values >= low) & (values <= high)
+    position = np.zeros(len(values), dtype=np.int64)
+    position[inside] = np.minimum(((values[inside] - low) * (bins / (high - low))).astype(np.int64), bins - 1)
+    position[~inside] = -1
+    return position
+
+
+class DensityTiles:
+    """
+    2-D histograms of one view at every zoom level, split by RCS_SIZE
+
+    Points are binned once at the finest level with a single bincount over
+    (RCS size, y bin, x bin), and each coarser level is the 2x2 block sum
+    of the level below, so every tile of every zoom is a slice of a
+    precomputed grid. Points outside the view's ranges, or without an RCS
+    size, are not counted.
+    """
+
+    def __init__(self, df, view):
+        self.view = view
+        self.spec = DENSITY_VIEWS[view]
+        size = TILE_SIZE << MAX_ZOOM
+
+        sizes = df['RCS_SIZE']
+        self.groups = list(sizes.cat.categories)
+        codes = sizes.cat.codes.to_numpy()
+        x_bins = _bins(df[self.spec['x']].to_numpy(dtype=float), self.spec['x_range'], size)
+        y_bins = _bins(df[self.spec['y']].to_numpy(dtype=float), self.spec['y_range'], size)
+
+        counted = (codes >= 0) & (x_bins >= 0) & (y_bins >= 0)
+        cells = (codes[counted].astype(np.int64) * size + y_bins[counted]) * size + x_bins[counted]
+        grid = np.bincount(cells, minlength=len(self.groups) * size * size)
+        grid = grid.astype(np.uint32).reshape(len(self.groups), size, size)
+
+        self.levels = [grid]
+        while len(self.levels) <= MAX_ZOOM:
+            finer = self.levels[0]
+            half = finer.shape[1] // 2
+            self.levels.insert(0, finer.reshape(len(self.groups), half, 2, half, 2).sum(axis=(2, 4), dtype=np.uint32))
+
+    def tile_range(self, zoom, tile_x, tile_y):
+        """Data ranges ((x min, x max), (y min, y max)) covered by one tile"""
+        ranges = []
+        for tile, (low, high) in ((tile_x, self.spec['x_range']), (tile_y, self.spec['y_range'])):
+            step = (high - low) / (1 << zoom)
+            ranges.append((low + tile * step, low + (tile + 1) * step))
+        return tuple(ranges)
+
+    def tile(self, zoom, tile_x, tile_y):
+        """
+        Count grids of one tile, one per RCS size
+
+        Tile (0, 0) is at the lowest x and y, and grid rows run along y, the
+        orientation a plotly heatmap expects.
+
+        Returns:
+            numpy.ndarray: counts shaped (groups, TILE_SIZE, TILE_SIZE)
+
+        Raises:
+            ValueError: if the zoom level or tile is out of range
+        """
+        if not 0 <= zoom <= MAX_ZOOM:
+            raise ValueError(f"Zoom must be between 0 and {MAX_ZOOM}")
+        tiles = 1 << zoom
+        if not (0 <= tile_x < tiles and 0 <= tile_y < tiles):
+            raise ValueError(f"Tile must be between 0 and {tiles - 1} at zoom {zoom}")
+        rows = slice(tile_y * TILE_SIZE, (tile_y + 1) * TILE_SIZE)
+        columns = slice(tile_x * TILE_SIZE, (tile_x + 1) * TILE_SIZE)
+        return self.levels[zoom][:, rows, columns]
@@ -0,0 +1,109 @@
+import numpy as np
+
+# Upper bound on grid cells per axis used to stratify a sample
+MAX_GRID_CELLS = 64
+
+# Knuth's multiplicative hash constant, used to order points within a cell
+HASH_MULTIPLIER = np.uint64(2654435761)
+
+
+def _bounds(values, value_range):
+    """Explicit (min, max) where given, falling back to the data range"""
+    low, high = value_range if value_range is not None else (None, None)
+    if low is None:
+        low = values.min()
+    if high is None:
+        high = values.max()
+    return float(low), float(high)
+
+
+def _grid_position(values, low, high, cells):
+    """Grid column (or row) of every value over [low, high]"""
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    position = ((values - low) * (cells / (high - low))).astype(np.int64)
+    return np.clip(position, 0, cells - 1)
+
+
+def viewport_mask(x, y, x_range=None, y_range=None):
+    """
+    Points with finite coordinates inside the viewport
+
+    Args:
+        x, y (numpy.ndarray): Point coordinates
+        x_range, y_range (tuple): (min, max), either of which may be None
+    """
+    mask = np.isfinite(x) & np.isfinite(y)
+    for values, value_range in ((x, x_range), (y, y_range)):
+        if value_range is None:
+            continue
+        low, high = value_range
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    return mask
+
+
+def downsample(x, y, groups, max_points, x_range=None, y_range=None, keys=None):
+    """
+    Pick at most max_points points that keep the shape of every group
+
+    Points are bucketed into a grid over the viewport, separately for each
+    group. Every occupied cell keeps at least one point, so sparse regions
+    and outliers survive; the rest of the budget is shared in proportion to
+    the cell counts, so dense regions stay dense. Within a cell points are
+    taken in the order of a hash of their key, so the same request returns
+    the same subset and zooming in mostly adds points instead of swapping them.
+
+    Args:
+        x, y (numpy.ndarray): Point coordinates
+        groups (numpy.ndarray): Group code of every point (e.g. RCS_SIZE codes)
+        max_points (int): Most points to keep
+        x_range, y_range (tuple): Viewport as (min, max), either may be None
+        keys (numpy.ndarray): Stable integer id of every point, defaults to its position
+
+    Returns:
+        numpy.ndarray: sorted positions of the kept points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    positions = np.flatnonzero(viewport_mask(x, y, x_range, y_range))
+    if len(positions) <= max_points:
+        return positions
+
+    xs, ys = x[positions], y[positions]
+    group_ids, group_index = np.unique(np.asarray(groups)[positions], return_inverse=True)
+    keys = positions if keys is None else np.asarray(keys)[positions]
+
+    # Coarse enough that occupied cells use at most half of the budget
+    cells = int(np.clip(np.sqrt(max_points / (2 * len(group_ids))), 1, MAX_GRID_CELLS))
+    x_low, x_high = _bounds(xs, x_range)
+    y_low, y_high = _bounds(ys, y_range)
+    cell = ((group_index * cells + _grid_position(ys, y_low, y_high, cells)) * cells
+            + _grid_position(xs, x_low, x_high, cells))
+
+    hashed = (keys.astype(np.uint64) * HASH_MULTIPLIER) & np.uint64(0xFFFFFFFF)
+    order = np.lexsort((hashed, cell))
+    sorted_cells = cell[order]
+    starts = np.flatnonzero(np.concatenate([[True], sorted_cells[1:] != sorted_cells[:-1]]))
+    counts = np.diff(np.append(starts, len(order)))
+
+    # One point per occupied cell, then the spare budget in proportion to what is left
+    spare = max_points - len(starts)
+    quota = np.ones(len(starts), dtype=np.int64)
+    if spare > 0:
+        share = (counts - 1) * (spare / (len(order) - len(starts)))
+        quota += share.astype(np.int64)
+        # Points lost to rounding go to the cells with the largest remainders
+        fraction = share - np.floor(share)
+        leftover = min(max_points - int(quota.sum()), int(np.count_nonzero(fraction)))
+        if leftover > 0:
+            quota[np.argpartition(-fraction, leftover - 1)[:leftover]] += 1
+    rank = np.arange(len(order)) - np.repeat(starts, counts)
+    kept = order[rank < np.repeat(quota, counts)]
+
+    if len(kept) > max_points:
+        # More occupied cells than points allowed: keep the lowest hashes
+        kept = kept[np.argsort(hashed[kept], kind='stable')[:max_points]]
+    return np.sort(positions[kept])
@@ -0,0 +1,355 @@
+import operator
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Longest expression accepted from a query string
+MAX_EXPRESSION_LENGTH = 2000
+
+# Deepest nesting of parentheses and NOT accepted; the parser and the mask
+# evaluator both recurse once per level
+MAX_NESTING_DEPTH = 64
+
+# Total bytes of cached masks per snapshot (one byte per row per mask)
+MAX_MASK_CACHE_BYTES = int(os.environ.get('FILTER_MASK_CACHE_BYTES', 64 * 1024 * 1024))
+
+KEYWORDS = {'AND', 'OR', 'NOT', 'IN', 'IS', 'NULL', 'BETWEEN'}
+
+COMPARISONS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<>': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+
+TOKEN_PATTERN = re.compile(r"""\s*(?:
+    (?P<string>'(?:[^']|'')*'|"(?:[^"]|"")*")
+  | (?P<op><=|>=|!=|<>|==|=|<|>)
+  | (?P<punct>[(),])
+  | (?P<word>[A-Za-z0-9_.:+\-]+)
+)""", re.VERBOSE)
+
+
+def _tokenize(text):
+    """Split an expression into (kind, value) tokens"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if match is None:
+            raise ValueError(f"Invalid filter expression near: {text[position:position + 20]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            # Quoted literal; a doubled quote stands for the quote itself
+            quote = value[0]
+            tokens.append(('literal', value[1:-1].replace(quote * 2, quote)))
+        elif kind == 'word' and value.upper() in KEYWORDS:
+            tokens.append(('keyword', value.upper()))
+        elif kind == 'word':
+            tokens.append(('word', value))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser for filter expressions
+
+    Grammar:
+        expr       := term (OR term)*
+        term       := factor (AND factor)*
+        factor     := NOT factor | '(' expr ')' | predicate
+        predicate  := column op value
+                    | column [NOT] BETWEEN value AND value
+                    | column [NOT] IN '(' value (',' value)* ')'
+                    | column IS [NOT] NULL
+
+    Nodes are nested tuples: ('and', children), ('or', children),
+    ('not', child), ('cmp', column, op, value), ('in', column, values) and
+    ('null', column). Children of AND / OR are sorted so equivalent
+    expressions share cache entries. Comparisons never match missing values;
+    NOT is plain negation, so NOT (x = 1) also matches rows where x is missing.
+    """
+
+    def __init__(self, tokens, columns):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+        self.columns = {column.upper(): column for column in columns}
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, None)
+
+    def take(self, kind=None, value=None):
+        token_kind, token_value = self.peek()
+        if token_kind is None:
+            raise ValueError('Unexpected end of filter expression')
+        if (kind and token_kind != kind) or (value and token_value != value):
+            raise ValueError(f"Unexpected {token_value!r} in filter expression")
+        self.position += 1
+        return token_value
+
+    def accept(self, kind, value=None):
+        token_kind, token_value = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def parse(self):
+        node = self.expr()
+        if self.peek()[0] is not None:
+            raise ValueError(f"Unexpected {self.peek()[1]!r} in filter expression")
+        return node
+
+    def expr(self):
+        children = [self.term()]
+        while self.accept('keyword', 'OR'):
+            children.append(self.term())
+        return _combine('or', children)
+
+    def term(self):
+        children = [self.factor()]
+        while self.accept('keyword', 'AND'):
+            children.append(self.factor())
+        return _combine('and', children)
+
+    def factor(self):
+        if self.accept('keyword', 'NOT'):
+            self.nest()
+            node = _negate(self.factor())
+            self.depth -= 1
+            return node
+        if self.accept('punct', '('):
+            self.nest()
+            node = self.expr()
+            self.take('punct', ')')
+            self.depth -= 1
+            return node
+        return self.predicate()
+
+    def nest(self):
+        self.depth += 1
+        if self.depth > MAX_NESTING_DEPTH:
+            raise ValueError(f"Filter expression nested more than {MAX_NESTING_DEPTH} levels deep")
+
+    def value(self):
+        kind, value = self.peek()
+        if kind is None:
+            raise ValueError('Unexpected end of filter expression')
+        if kind not in ('literal', 'word'):
+            raise ValueError(f"Expected a value in filter expression, got {value!r}")
+        self.position += 1
+        return value
+
+    def column(self):
+        name = self.take('word')
+        column = self.columns.get(name.upper())
+        if column is None:
+            raise ValueError(f"Unknown filter column: {name}")
+        return column
+
+    def predicate(self):
+        column = self.column()
+        if self.accept('keyword', 'IS'):
+            negated = self.accept('keyword', 'NOT')
+            self.take('keyword', 'NULL')
+            node = ('null', column)
+            return _negate(node) if negated else node
+
+        negated = self.accept('keyword', 'NOT')
+        if self.accept('keyword', 'BETWEEN'):
+            low = self.value()
+            self.take('keyword', 'AND')
+            high = self.value()
+            node = _combine('and', [('cmp', column, '>=', low), ('cmp', column, '<=', high)])
+        elif self.accept('keyword', 'IN'):
+            self.take('punct', '(')
+            values = [self.value()]
+            while self.accept('punct', ','):
+                values.append(self.value())
+            self.take('punct', ')')
+            node = ('in', column, tuple(sorted(set(values))))
+        elif negated:
+            raise ValueError('NOT must be followed by BETWEEN or IN after a column')
+        else:
+            op = self.take('op')
+            node = ('cmp', column, op, self.value())
+        return _negate(node) if negated else node
+
+
+def _combine(kind, children):
+    """Build a flattened AND / OR node with its children in canonical order"""
+    flat = []
+    for child in children:
+        if child[0] == kind:
+            flat.extend(child[1])
+        else:
+            flat.append(child)
+    if len(flat) == 1:
+        return flat[0]
+    return (kind, tuple(sorted(set(flat), key=repr)))
+
+
+def _negate(node):
+    if node[0] == 'not':
+        return node[1]
+    return ('not', node)
+
+
+@lru_cache(maxsize=256)
+def parse_filter(expression, columns):
+    """
+    Parse a filter expression into its canonical node tree
+
+    Args:
+        expression (str): e.g. "OBJECT_TYPE IN (DEBRIS, 'ROCKET BODY') AND PERIAPSIS < 600"
+        columns (tuple): Catalog column names; matched case-insensitively
+
+    Raises:
+        ValueError: if the expression is invalid
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Filter expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    tokens = _tokenize(expression)
+    if not tokens:
+        raise ValueError('Empty filter expression')
+    return _Parser(tokens, columns).parse()
+
+
+class MaskCache:
+    """Size-bounded LRU of boolean row masks keyed by canonical sub-expression"""
+
+    def __init__(self, max_bytes=MAX_MASK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._masks = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+            return mask
+
+    def put(self, key, mask):
+        # Cached masks are shared between requests
+        mask.flags.writeable = False
+        with self._lock:
+            if key not in self._masks:
+                self._masks[key] = mask
+                self._bytes += mask.nbytes
+            while self._bytes > self.max_bytes and len(self._masks) > 1:
+                _, evicted = self._masks.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+
+def _number(column, value):
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Column {column} expects a number, got {value!r}")
+
+
+def _predicate_mask(df, node):
+    """Evaluate a single-column predicate over every row"""
+    kind, column = node[0], node[1]
+    series = df[column]
+    if kind == 'null':
+        return series.isna().to_numpy()
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Evaluate on the few categories, then gather by code; code -1
+        # (missing) picks the trailing False
+        categories = series.cat.categories
+        if kind == 'in':
+            matches = categories.isin(node[2])
+        else:
+            matches = np.asarray(COMPARISONS[node[2]](categories, node[3]), dtype=bool)
+        lookup = np.append(matches, False)
+        return lookup[series.cat.codes.to_numpy()]
+
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy()
+        if kind == 'in':
+            return np.isin(values, [_number(column, value) for value in node[2]])
+        mask = COMPARISONS[node[2]](values, _number(column, node[3]))
+        if node[2] in ('!=', '<>') and values.dtype.kind == 'f':
+            mask &= ~np.isnan(values)
+        return mask
+
+    notna = series.notna().to_numpy()
+    if kind == 'in':
+        return series.isin(node[2]).to_numpy() & notna
+    result = COMPARISONS[node[2]](series, node[3])
+    return result.to_numpy(dtype=bool, na_value=False) & notna
+
+
+def _mask(df, node, cache):
+    key = repr(node)
+    mask = cache.get(key)
+    if mask is not None:
+        return mask
+
+    kind = node[0]
+    if kind == 'and':
+        mask = np.logical_and.reduce([_mask(df, child, cache) for child in node[1]])
+    elif kind == 'or':
+        mask = np.logical_or.reduce([_mask(df, child, cache) for child in node[1]])
+    elif kind == 'not':
+        mask = ~_mask(df, node[1], cache)
+    else:
+        mask = _predicate_mask(df, node)
+    cache.put(key, mask)
+    return mask
+
+
+def filter_mask(snapshot, expression):
+    """
+    Boolean row mask of a filter expression over a catalog snapshot
+
+    Every sub-expression's mask is cached per snapshot, so repeating a
+    filter (or reusing part of one) only costs the final AND / OR.
+
+    Raises:
+        ValueError: if the expression is invalid
+    """
+    node = parse_filter(expression, tuple(snapshot.df.columns))
+    cache = snapshot.derived('filter_masks', MaskCache)
+    return _mask(snapshot.df, node, cache)
+
+
+def apply_filter(snapshot, expression, rows=None):
+    """
+    Narrow candidate rows by an optional filter expression
+
+    Args:
+        snapshot (CatalogSnapshot): Catalog to filter
+        expression (str): Filter expression, or None / empty for no filter
+        rows (numpy.ndarray): Sorted candidate row positions, or None for all rows
+
+    Returns:
+        numpy.ndarray or None: sorted row positions, or rows unchanged when there is no expression
+    """
+    if not expression or not expression.strip():
+        return rows
+    mask = filter_mask(snapshot, expression)
+    if rows is None:
+        return np.flatnonzero(mask)
+    return rows[mask[rows]]
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from utils.json_response import typed_array
+
+
+class RowGroups:
+    """
+    Rows of a frame grouped once by a categorical column
+
+    The rows are ordered by category code with one stable sort, so every
+    group is a contiguous slice. Each column a caller needs is gathered into
+    that order once, and every per-group trace is then a slice of those
+    arrays instead of a boolean scan of the whole frame per group. Rows with
+    no value in the group column sort first and belong to no group.
+    """
+
+    def __init__(self, df, column='RCS_SIZE'):
+        self.df = df
+        groups = df[column]
+        self.names = list(groups.cat.categories)
+        codes = groups.cat.codes.to_numpy()
+        self.order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes + 1, minlength=len(self.names) + 1)
+        # offsets[i + 1]:offsets[i + 2] are the rows of group i
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._columns = {}
+
+    def column(self, name):
+        """Values of a column in group order (category codes for categoricals)"""
+        values = self._columns.get(name)
+        if values is None:
+            series = self.df[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.cat.codes.to_numpy()[self.order]
+            else:
+                values = series.to_numpy()[self.order]
+            self._columns[name] = values
+        return values
+
+    def labels(self, name):
+        """Values of a categorical column in group order, as an object array"""
+        key = (name, 'labels')
+        values = self._columns.get(key)
+        if values is None:
+            # Trailing NaN for code -1, as str(NaN) is what the hover text showed before
+            lookup = np.append(np.asarray(self.df[name].cat.categories, dtype=object), np.nan)
+            values = lookup[self.column(name)]
+            self._columns[key] = values
+        return values
+
+    def groups(self):
+        """(name, slice) of every non-empty group, in category order"""
+        for i, name in enumerate(self.names):
+            start, end = self.offsets[i + 1], self.offsets[i + 2]
+            if end > start:
+                yield name, slice(start, end)
+
+
+def scatter_traces(groups, x_column, y_column, text, hovertemplate, payload=None,
+                   hover_columns=('OBJECT_TYPE', 'COUNTRY_CODE')):
+    """
+    One scatter trace per group
+
+    Args:
+        groups (RowGroups): Rows grouped by RCS size
+        x_column, y_column (str): Columns plotted on each axis
+        text (str): format() template of the per-point hover text, filled
+            with the hover columns followed by x and y
+        hovertemplate (str): Plotly hover template used by columnar traces
+        payload (dict): Columnar payload options, or None for plain traces
+        hover_columns (tuple): Categorical columns shown on hover
+
+    Returns:
+        list: trace dicts
+    """
+    x = groups.column(x_column)
+    y = groups.column(y_column)
+    traces = []
+
+    if payload:
+        for name, rows in groups.groups():
+            columns = {}
+            for column in hover_columns:
+                dtype = np.promote_types(np.int8, np.min_scalar_type(len(groups.df[column].cat.categories)))
+                columns[column] = typed_array(groups.column(column)[rows], dtype)
+            traces.append({
+                'x': typed_array(x[rows], payload['precision']),
+                'y': typed_array(y[rows], payload['precision']),
+                'mode': 'markers',
+                'type': 'scatter',
+                'name': name,
+                'columns': columns,
+                'hovertemplate': hovertemplate
+            })
+        return traces
+
+    fmt = text.format
+    labels = [groups.labels(column) for column in hover_columns]
+    for name, rows in groups.groups():
+        # Plain Python values format much faster than NumPy scalars
+        fields = [values[rows].tolist() for values in labels] + [x[rows].tolist(), y[rows].tolist()]
+        traces.append({
+            'x': x[rows],
+            'y': y[rows],
+            'mode': 'markers',
+            'type': 'scatter',
+            'name': name,
+            'text': [fmt(*values) for values in zip(*fields)],
+            'hoverinfo': 'text'
+        })
+    return traces
@@ -0,0 +1,101 @@
+import numpy as np
+
+from utils.grouped_traces import RowGroups
+
+# Most bins a histogram request may ask for
+MAX_HISTOGRAM_BINS = 1000
+
+
+def histogram_edges(low, high, bins=50, bin_width=None, log=False):
+    """
+    Bin edges over [low, high]
+
+    Args:
+        low, high (float): Window to bin
+        bins (int): Number of bins, when no bin width is given
+        bin_width (float): Width of each bin; the last bin may reach past high
+        log (bool): Logarithmically spaced bins (low must be positive)
+
+    Raises:
+        ValueError: if the window or binning is invalid
+    """
+    if not (np.isfinite(low) and np.isfinite(high)):
+        raise ValueError('The histogram window must be finite')
+    if not high > low:
+        raise ValueError('The histogram window is empty')
+    if log:
+        if bin_width is not None:
+            raise ValueError('bin_width cannot be combined with log bins')
+        if low <= 0:
+            raise ValueError('Log bins need a positive lower bound')
+    if bin_width is not None:
+        if not (np.isfinite(bin_width) and bin_width > 0):
+            raise ValueError('bin_width must be positive and finite')
+        # Capped before int(), which overflows when a tiny width makes the count infinite
+        bins = int(min(np.ceil((high - low) / bin_width), MAX_HISTOGRAM_BINS + 1))
+    if bins is None or bins < 1:
+        raise ValueError('bins must be at least 1')
+    if bins > MAX_HISTOGRAM_BINS:
+        raise ValueError(f"At most {MAX_HISTOGRAM_BINS} bins are allowed")
+
+    if log:
+        return np.geomspace(low, high, bins + 1)
+    if bin_width is not None:
+        return low + np.arange(bins + 1) * bin_width
+    return np.linspace(low, high, bins + 1)
+
+
+class GroupedValues:
+    """
+    Values of one column sorted within each group of a categorical column
+
+    Built once per snapshot, it turns any histogram (any window, bin width
+    or log scale) into one binary search per edge and group instead of a
+    pass over the catalog. Missing values and rows without a group are left
+    out.
+    """
+
+    def __init__(self, df, column, group_column):
+        groups = RowGroups(df, group_column)
+        self.groups = groups.names
+        values = groups.column(column).astype(float)
+
+        sorted_values = [np.empty(0)] * len(self.groups)
+        for name, rows in groups.groups():
+            group_values = values[rows]
+            group_values = group_values[np.isfinite(group_values)]
+            group_values.sort()
+            sorted_values[self.groups.index(name)] = group_values
+        self.values = np.concatenate(sorted_values)
+        self.offsets = np.concatenate([[0], np.cumsum([len(v) for v in sorted_values])])
+
+    def group_values(self, group):
+        """Sorted values of one group, by its position in self.groups"""
+        return self.values[self.offsets[group]:self.offsets[group + 1]]
+
+    def range(self, above=None):
+        """(min, max) over all groups, optionally only of values above a bound"""
+        values = self.values if above is None else self.values[self.values > above]
+        if len(values) == 0:
+            return None, None
+        return float(values.min()), float(values.max())
+
+    def histogram(self, edges, above=None):
+        """
+        Counts per group between consecutive edges
+
+        Like numpy.histogram, bins are half-open except the last, which
+        includes its upper edge. Values not above `above` are not counted.
+
+        Returns:
+            numpy.ndarray: counts shaped (groups, len(edges) - 1)
+        """
+        counts = np.zeros((len(self.groups), len(edges) - 1), dtype=np.int64)
+        for group in range(len(self.groups)):
+            values = self.group_values(group)
+            if above is not None:
+                values = values[np.searchsorted(values, above, side='right'):]
+            positions = np.searchsorted(values, edges, side='left')
+            positions[-1] = np.searchsorted(values, edges[-1], side='right')
+            counts[group] = np.diff(positions)
+        return counts
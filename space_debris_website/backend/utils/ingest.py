@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def journal_path(csv_path):
+    """Delta journal that belongs to a catalog CSV"""
+    override = os.environ.get('CATALOG_DELTA_LOG')
+    if override:
+        return override
+    return f"{os.path.splitext(csv_path)[0]}.deltas.jsonl"
+
+
+def _norad_id(value):
+    """Parse a NORAD catalog number, raising ValueError if it is not one"""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid NORAD_CAT_ID: {value}")
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return int(value)
+    raise ValueError(f"Invalid NORAD_CAT_ID: {value}")
+
+
+def _epoch(value):
+    """Parse an EPOCH as a naive UTC timestamp, raising ValueError if it is not one"""
+    try:
+        epoch = pd.Timestamp(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Invalid EPOCH: {value}")
+    if pd.isna(epoch):
+        raise ValueError(f"Invalid EPOCH: {value}")
+    if epoch.tzinfo is not None:
+        # The catalog's epochs are naive UTC; aware and naive ones cannot be compared
+        epoch = epoch.tz_convert('UTC').tz_localize(None)
+    return epoch
+
+
+def parse_delta(payload):
+    """
+    Validate a delta of upserted and decayed objects
+
+    A delta is an object with an "upserts" list of catalog records, each
+    with at least NORAD_CAT_ID and EPOCH, and a "decays" list of NORAD ids
+    (or records with NORAD_CAT_ID) of objects that have re-entered.
+
+    Returns:
+        dict: the normalized delta
+
+    Raises:
+        ValueError: if the payload is not a valid delta
+    """
+    if not isinstance(payload, dict):
+        raise ValueError('Delta must be a JSON object')
+    upserts = payload.get('upserts') or []
+    decays = payload.get('decays') or []
+    if not isinstance(upserts, list) or not isinstance(decays, list):
+        raise ValueError('"upserts" and "decays" must be lists')
+    if not upserts and not decays:
+        raise ValueError('Delta has no upserts or decays')
+
+    records = []
+    for record in upserts:
+        if not isinstance(record, dict):
+            raise ValueError('Each upsert must be an object')
+        if 'EPOCH' not in record:
+            raise ValueError('Each upsert needs an EPOCH')
+        record = dict(record, NORAD_CAT_ID=_norad_id(record.get('NORAD_CAT_ID')))
+        epoch = _epoch(record['EPOCH'])
+        if pd.Timestamp(record['EPOCH']).tzinfo is not None:
+            # Journaled as naive UTC, like the epochs already in the catalog
+            record['EPOCH'] = epoch.isoformat()
+        records.append(record)
+
+    decayed = []
+    for decay in decays:
+        decayed.append(_norad_id(decay.get('NORAD_CAT_ID') if isinstance(decay, dict) else decay))
+
+    return {'upserts': records, 'decays': decayed}
+
+
+def append_delta(path, delta):
+    """
+    Append a delta to the journal as one JSON line
+
+    Returns:
+        tuple: (offset the line starts at, journal size after the append)
+    """
+    line = json.dumps(delta, default=str, separators=(',', ':')) + '\n'
+    # One write in append mode, so concurrent writers do not interleave lines
+    with open(path, 'a') as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+        end = f.tell()
+        return end - len(line), end
+
+
+def read_deltas(path, offset=0):
+    """
+    Read the complete journal lines after a byte offset
+
+    Returns:
+        list: (end offset, delta or None) for every line; None marks a line
+        that could not be parsed
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+
+    deltas = []
+    position = offset
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            # Still being written
+            break
+        position += len(line)
+        try:
+            delta = parse_delta(json.loads(line))
+        except ValueError as e:
+            print(f"Skipping invalid catalog delta at offset {position - len(line)}: {e}")
+            delta = None
+        deltas.append((position, delta))
+    return deltas
+
+
+class RowChange:
+    """
+    How the rows of one snapshot map onto the next
+
+    Attributes:
+        kept (numpy.ndarray): Boolean mask over old rows that survive unchanged
+        removed (numpy.ndarray): Sorted old positions that were decayed or replaced
+        remap (numpy.ndarray): New position of every old row, -1 where it was decayed
+        added (numpy.ndarray): Sorted new positions of replaced and inserted rows
+    """
+
+    def __init__(self, kept, removed, remap, added):
+        self.kept = kept
+        self.removed = removed
+        self.remap = remap
+        self.added = added
+
+
+def _align_incoming(df, incoming):
+    """
+    Give the incoming rows the catalog's column types so both can be concatenated
+
+    Returns:
+        tuple: (catalog frame with categories extended where needed, aligned incoming rows)
+    """
+    extended = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            extra = pd.Index(incoming[column].dropna().unique()).difference(series.cat.categories)
+            if len(extra):
+                # New values go after the existing ones so old codes stay valid
+                series = series.cat.add_categories(extra)
+                extended[column] = series
+            incoming[column] = pd.Categorical(incoming[column], categories=series.cat.categories)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            incoming[column] = pd.to_numeric(incoming[column], errors='coerce')
+        else:
+            incoming[column] = incoming[column].astype(series.dtype)
+    if extended:
+        df = df.assign(**extended)
+    return df, incoming
+
+
+def apply_delta(df, index, delta):
+    """
+    Apply a delta to a catalog frame without modifying it
+
+    An upsert replaces the catalog row for its NORAD id unless that row has
+    a later EPOCH; fields missing from the upsert keep their current
+    values. Objects not in the catalog are appended. Decays are applied
+    last and drop every row of the object.
+
+    Args:
+        df (DataFrame): Current catalog
+        index (CatalogIndex): Index over df
+        delta (dict): Delta from parse_delta
+
+    Returns:
+        tuple: (new DataFrame, RowChange, summary counts)
+    """
+    decayed = set(delta['decays'])
+
+    # The latest epoch per object wins within a delta; later records win ties
+    latest = {}
+    for record in delta['upserts']:
+        norad_id = record['NORAD_CAT_ID']
+        if norad_id in decayed:
+            continue
+        epoch = _epoch(record['EPOCH'])
+        if norad_id not in latest or epoch >= latest[norad_id][0]:
+            latest[norad_id] = (epoch, record)
+
+    ids = list(latest)
+    rows = index.find_rows(ids) if ids else np.empty(0, dtype=np.intp)
+    found = rows >= 0
+    existing = iter(df.iloc[rows[found]].to_dict('records'))
+
+    replaced, replacements, inserts = [], [], []
+    stale = 0
+    for norad_id, row in zip(ids, rows):
+        epoch, record = latest[norad_id]
+        if row < 0:
+            inserts.append(record)
+            continue
+        current = next(existing)
+        if pd.notna(current.get('EPOCH')) and _epoch(current['EPOCH']) > epoch:
+            stale += 1
+            continue
+        current.update(record)
+        replaced.append(row)
+        replacements.append(current)
+
+    dropped = np.isin(index.norad_ids, list(decayed)) if decayed else np.zeros(len(df), dtype=bool)
+    summary = {
+        'inserted': len(inserts),
+        'updated': len(replaced),
+        'stale': stale,
+        'decayed': int(np.count_nonzero(dropped))
+    }
+
+    order = np.argsort(replaced, kind='stable')
+    replaced = np.asarray(replaced, dtype=np.intp)[order]
+    incoming = pd.DataFrame([replacements[i] for i in order] + inserts, columns=df.columns)
+
+    survivors = np.flatnonzero(~dropped)
+    remap = np.full(len(df), -1, dtype=np.intp)
+    remap[survivors] = np.arange(len(survivors))
+
+    kept = ~dropped
+    kept[replaced] = False
+    removed = np.flatnonzero(~kept)
+    added = np.concatenate([
+        remap[replaced],
+        len(survivors) + np.arange(len(inserts))
+    ]).astype(np.intp)
+
+    # Every new row is taken either from the catalog or from the incoming rows
+    source = survivors.copy()
+    source[remap[replaced]] = len(df) + np.arange(len(replaced))
+    source = np.concatenate([source, len(df) + len(replaced) + np.arange(len(inserts))])
+
+    df, incoming = _align_incoming(df, incoming)
+    combined = pd.concat([df, incoming], ignore_index=True)
+    new_df = combined.take(source).reset_index(drop=True)
+    return new_df, RowChange(kept, removed, remap, added), summary
+
+
+def _read_upserts_csv(path):
+    """Catalog records from a CSV in the same layout as space_decay.csv"""
+    df = pd.read_csv(path)
+    return json.loads(df.to_json(orient='records'))
+
+
+def main(argv=None):
+    """Append a delta to the journal of the catalog the API serves"""
+    parser = argparse.ArgumentParser(description='Ingest new or decayed objects into the debris catalog')
+    parser.add_argument('delta', nargs='?', help='JSON file with "upserts" and "decays" lists')
+    parser.add_argument('--upserts', help='CSV of OMM records to insert or update')
+    parser.add_argument('--decay', nargs='+', default=[], help='NORAD ids of objects that have decayed')
+    parser.add_argument('--catalog', help='Catalog CSV (defaults to the one the API loads)')
+    args = parser.parse_args(argv)
+
+    payload = {'upserts': [], 'decays': list(args.decay)}
+    if args.delta:
+        with open(args.delta) as f:
+            delta_file = json.load(f)
+        payload['upserts'] += delta_file.get('upserts') or []
+        payload['decays'] += delta_file.get('decays') or []
+    if args.upserts:
+        payload['upserts'] += _read_upserts_csv(args.upserts)
+
+    try:
+        delta = parse_delta(payload)
+    except ValueError as e:
+        print(f"Invalid delta: {e}")
+        return 1
+
+    from utils.catalog import catalog_store
+    csv_path = args.catalog or catalog_store.resolve_path()
+    if csv_path is None:
+        print("Data file not found")
+        return 1
+
+    path = journal_path(csv_path)
+    append_delta(path, delta)
+    print(f"Appended {len(delta['upserts'])} upserts and {len(delta['decays'])} decays to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
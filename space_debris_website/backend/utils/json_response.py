@@ -0,0 +1,152 @@
+import base64
+import json
+import math
+import os
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+
+def _default(obj):
+    """Convert NumPy / pandas values the encoders do not handle natively"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Series, pd.Index, pd.Categorical)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# NumPy dtypes plotly.js can decode from base64, by their typed array code
+TYPED_ARRAY_CODES = {
+    'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2',
+    'int32': 'i4', 'uint32': 'u4', 'float32': 'f4', 'float64': 'f8'
+}
+
+
+def typed_array(values, dtype=None):
+    """
+    Encode an array as a plotly.js typed array spec
+
+    The spec is {"dtype": "u2", "bdata": <base64 little-endian bytes>},
+    with "shape": "rows, columns" for 2-D arrays. plotly.js accepts it
+    wherever it accepts a plain array, and it is a fraction of the size of
+    the same numbers written out as JSON.
+
+    Args:
+        values (array-like): Values to encode
+        dtype (str or numpy.dtype): Convert to this type first, e.g. 'float32'
+    """
+    array = np.asarray(values, dtype=dtype)
+    code = TYPED_ARRAY_CODES.get(array.dtype.name)
+    if code is None:
+        raise ValueError(f"No typed array type for {array.dtype}")
+    array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    spec = {'dtype': code, 'bdata': base64.b64encode(array.tobytes()).decode('ascii')}
+    if array.ndim > 1:
+        spec['shape'] = ', '.join(str(n) for n in array.shape)
+    return spec
+
+
+def _finite(obj):
+    """
+    Copy of obj with NaN and infinities replaced by None
+
+    The standard library would write them as bare NaN / Infinity, which is
+    not valid JSON; orjson writes null, and both encoders have to agree.
+    NumPy and pandas values are converted first so their floats are seen.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    try:
+        converted = _default(obj)
+    except TypeError:
+        # Left for json.dumps to report
+        return obj
+    return _finite(converted)
+
+
+def dumps_json(obj):
+    """Encode with the standard library, accepting NumPy and pandas values"""
+    return json.dumps(_finite(obj), default=_default, allow_nan=False, separators=(',', ':')).encode()
+
+
+def dumps_orjson(obj):
+    """
+    Encode with orjson
+
+    NumPy arrays are serialized directly from their buffers without building
+    Python lists first, and NaN becomes null.
+    """
+    return orjson.dumps(obj, default=_default,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+ENCODERS = {'json': dumps_json}
+if orjson is not None:
+    ENCODERS['orjson'] = dumps_orjson
+
+DEFAULT_ENCODER = 'orjson' if orjson is not None else 'json'
+
+
+def init_json_response(app, encoder=None):
+    """
+    Select the response encoder for an app
+
+    The encoder is taken from the argument, then the JSON_RESPONSE_ENCODER
+    config value or environment variable, then the fastest one installed.
+    On Flask versions with JSON providers, plain flask.jsonify is routed
+    through it as well.
+    """
+    name = (encoder or app.config.get('JSON_RESPONSE_ENCODER')
+            or os.environ.get('JSON_RESPONSE_ENCODER') or DEFAULT_ENCODER)
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown JSON encoder: {name}")
+    app.extensions['json_response'] = ENCODERS[name]
+
+    try:
+        from flask.json.provider import DefaultJSONProvider
+    except ImportError:  # Flask < 2.2
+        return
+
+    class ResponseJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return ENCODERS[name](obj).decode()
+
+    app.json = ResponseJSONProvider(app)
+
+
+def json_response(*args, **kwargs):
+    """
+    Drop-in replacement for flask.jsonify using the app's response encoder
+
+    Accepts the same arguments as jsonify: a single value, several values
+    (sent as a list) or keyword arguments (sent as an object).
+    """
+    if args and kwargs:
+        raise TypeError('json_response() behavior undefined when passed both args and kwargs')
+    if len(args) == 1:
+        data = args[0]
+    else:
+        data = args or kwargs
+
+    encoder = current_app.extensions.get('json_response', ENCODERS[DEFAULT_ENCODER])
+    return current_app.response_class(encoder(data) + b'\n', mimetype='application/json')
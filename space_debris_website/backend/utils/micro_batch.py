@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+# Longest a batch waits for more rows once requests arrive concurrently
+DEFAULT_WINDOW_MS = float(os.environ.get('PREDICTION_BATCH_WINDOW_MS', 2.0))
+
+# Most rows scored in one batch
+DEFAULT_MAX_BATCH = int(os.environ.get('PREDICTION_BATCH_MAX_ROWS', 64))
+
+# Longest a request waits for its batch before scoring its row on its own
+DEFAULT_TIMEOUT_MS = float(os.environ.get('PREDICTION_BATCH_TIMEOUT_MS', 2000))
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row predictions into one batch evaluation
+
+    Requests put their row on a queue and wait. A worker thread takes
+    everything queued, runs the batch function once over the stacked rows
+    and hands every request its own row of the outputs. While batches keep
+    holding more than one row (i.e. requests are arriving concurrently) the
+    worker waits up to window_ms for more rows, or until max_batch rows;
+    a lone request under light load is scored straight away.
+
+    A worker that has died is restarted by the next request, and a request
+    whose batch does not finish within timeout_ms scores its row itself, so
+    a stuck worker slows requests down rather than hanging them.
+    """
+
+    def __init__(self, batch_fn, max_batch=DEFAULT_MAX_BATCH, window_ms=DEFAULT_WINDOW_MS,
+                 timeout_ms=DEFAULT_TIMEOUT_MS):
+        """
+        Args:
+            batch_fn (callable): Maps a 2-D feature array to a tuple of
+                per-row sequences, e.g. a predictor's _evaluate
+            max_batch (int): Most rows per batch
+            window_ms (float): Longest wait for more rows, in milliseconds
+            timeout_ms (float): Longest wait for a batch before scoring the row alone
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self.timeout = timeout_ms / 1000
+        self.timeouts = 0
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._concurrent = False
+        self._worker = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._worker is not None and self._pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # The parent's queue (and its lock) may have been mid-use when forked
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._worker = None
+            if self._worker is None or not self._worker.is_alive():
+                if self._worker is not None:
+                    print("Micro-batching worker stopped; starting a new one")
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, row):
+        """
+        Score one row as part of the next batch
+
+        Returns:
+            tuple: this row's element of every output of the batch function
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((row, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Left for the worker to skip if it has not picked the row up yet
+            future.cancel()
+            self.timeouts += 1
+            print(f"Micro-batch took over {self.timeout * 1000:.0f} ms; scoring the row directly")
+        outputs = self.batch_fn(row[None, :])
+        return tuple(output[0] for output in outputs)
+
+    def _collect(self):
+        """Take the next batch of (row, future) pairs off the queue"""
+        items = [self._queue.get()]
+        deadline = None
+        while len(items) < self.max_batch:
+            try:
+                items.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            if not self._concurrent:
+                break
+            if deadline is None:
+                deadline = time.perf_counter() + self.window
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        self._concurrent = len(items) > 1
+        return items
+
+    def _run(self):
+        while True:
+            # Requests that gave up waiting have cancelled their futures
+            items = [(row, future) for row, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not items:
+                continue
+            try:
+                outputs = self.batch_fn(np.vstack([row for row, _ in items]))
+                results = [tuple(output[i] for output in outputs) for i in range(len(items))]
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(items)
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
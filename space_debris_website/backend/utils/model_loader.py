@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+# Seconds clients are asked to wait before retrying a prediction while models load
+RETRY_AFTER_SECONDS = int(os.environ.get('PREDICTION_RETRY_AFTER', 5))
+
+
+class ModelLoader:
+    """
+    Builds the prediction models on background threads
+
+    Loading an artifact is quick, but a missing one is trained from the
+    catalog first, which can take minutes. Each model gets its own thread
+    so the app (and the models whose artifacts exist) do not wait for the
+    slowest one. Threads do not survive a fork, so a worker process that
+    finds models still pending starts loading them again.
+    """
+
+    def __init__(self, factories):
+        """
+        Args:
+            factories (dict): Model name -> callable returning the loaded model
+        """
+        self.factories = factories
+        self._models = {}
+        self._status = {name: {'state': 'pending', 'started': None, 'load_seconds': None, 'error': None}
+                        for name in factories}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start loading every model that is not loaded yet; does nothing if already started"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            for name in self.factories:
+                if name in self._models:
+                    continue
+                self._status[name] = {'state': 'loading', 'started': time.perf_counter(),
+                                      'load_seconds': None, 'error': None}
+                threading.Thread(target=self._load, args=(name,), name=f'load-{name}-model', daemon=True).start()
+
+    def _load(self, name):
+        started = self._status[name]['started']
+        try:
+            model = self.factories[name]()
+        except Exception as e:
+            print(f"Error loading {name} model: {e}")
+            with self._lock:
+                self._status[name].update(state='failed', error=str(e),
+                                          load_seconds=time.perf_counter() - started)
+            return
+
+        with self._lock:
+            self._models[name] = model
+            self._status[name].update(state='ready', load_seconds=time.perf_counter() - started)
+        print(f"{name} model ready in {self._status[name]['load_seconds']:.1f} s")
+
+    def get(self, name):
+        """The named model, or None while it is loading or if it failed to load"""
+        self.start()
+        return self._models.get(name)
+
+    def status(self):
+        """
+        Load state of every model
+
+        Returns:
+            dict: name -> {'state': pending | loading | ready | failed,
+                           'load_seconds': time taken (so far, while loading),
+                           'error': message if it failed}
+        """
+        self.start()
+        now = time.perf_counter()
+        with self._lock:
+            report = {}
+            for name, status in self._status.items():
+                seconds = status['load_seconds']
+                if seconds is None and status['started'] is not None:
+                    seconds = now - status['started']
+                report[name] = {
+                    'state': status['state'],
+                    'load_seconds': round(seconds, 3) if seconds is not None else None,
+                    'error': status['error']
+                }
+            return report
+
+    def ready(self):
+        """Whether every model has loaded"""
+        self.start()
+        return len(self._models) == len(self.factories)
+
+    def wait(self, timeout=None):
+        """
+        Block until no model is still loading
+
+        Returns:
+            bool: whether every model loaded
+        """
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        while any(status['state'] == 'loading' for status in self.status().values()):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            time.sleep(0.05)
+        return self.ready()
@@ -0,0 +1,203 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Names are truncated to this many characters for the trigram index
+MAX_NAME_LENGTH = 62
+
+# Minimum trigram similarity for a fuzzy match
+MIN_SIMILARITY = 0.3
+
+# Punctuation splits words for trigrams, so "STARLINK-3301" ~ "STARLINK 33"
+NON_ALPHANUMERIC = re.compile(r'[^A-Z0-9]+')
+
+
+def normalize_name(name):
+    """Upper-case a name and collapse runs of whitespace"""
+    return ' '.join(str(name).upper().split())
+
+
+def _trigram_matrix(names):
+    """
+    Trigram codes of each name, one row per name
+
+    Punctuation is treated as a space, and names are padded with a space
+    on both sides, so word starts and ends form trigrams of their own. Each
+    trigram is packed into an int32 from its three 7-bit characters.
+    Repeated trigrams within a name and the windows past its end are -1.
+    """
+    padded = np.array([
+        f" {NON_ALPHANUMERIC.sub(' ', name[:MAX_NAME_LENGTH]).strip()} ".encode('ascii', 'replace')
+        for name in names
+    ])
+    width = padded.dtype.itemsize
+    chars = padded.view(np.uint8).reshape(len(padded), width)
+    chars = chars.astype(np.int32) & 0x7F
+
+    codes = (chars[:, :-2] << 14) | (chars[:, 1:-1] << 7) | chars[:, 2:]
+    codes[chars[:, 2:] == 0] = -1
+    codes.sort(axis=1)
+    codes[:, 1:][codes[:, 1:] == codes[:, :-1]] = -1
+    return codes
+
+
+class NameSearchIndex:
+    """
+    Prefix and fuzzy search over OBJECT_NAME for one catalog snapshot
+
+    Distinct names are normalized and sorted, and the rows are grouped by
+    name in that order. A prefix query is then two binary searches that
+    bound one contiguous slice of rows (the sorted array plays the role of
+    a prefix trie). Fuzzy queries use an inverted trigram index in CSR form
+    (sorted trigram codes, offsets and name ids), ranking names by trigram
+    similarity: shared / (query trigrams + name trigrams - shared).
+    """
+
+    def __init__(self, df):
+        codes, uniques = pd.factorize(df['OBJECT_NAME'])
+        normalized = [normalize_name(name) for name in uniques]
+
+        # Merge names that only differ in case or spacing, then sort them
+        merged, names = pd.factorize(pd.Index(normalized), sort=True)
+        self.names = np.asarray(names, dtype=object)
+        self._group_rows(np.where(codes >= 0, merged[codes], -1))
+
+        # Inverted trigram index in CSR form
+        trigrams = _trigram_matrix(self.names) if len(self.names) else np.empty((0, 1), dtype=np.int32)
+        valid = trigrams >= 0
+        self.trigram_counts = valid.sum(axis=1)
+        name_ids = np.nonzero(valid)[0].astype(np.int32)
+        flat = trigrams[valid]
+        order = np.argsort(flat)
+        flat, self.trigram_names = flat[order], name_ids[order]
+        starts = np.flatnonzero(np.concatenate([[True], flat[1:] != flat[:-1]])) if len(flat) else np.empty(0, dtype=np.intp)
+        self.trigram_keys = flat[starts]
+        self.trigram_offsets = np.concatenate([starts, [len(flat)]])
+
+    def _group_rows(self, row_names):
+        """Group rows by name id (i.e. alphabetically), in row order within a name"""
+        named = np.flatnonzero(row_names >= 0)
+        self.name_rows = named[np.argsort(row_names[named], kind='stable')]
+        counts = np.bincount(row_names[named], minlength=len(self.names))
+        self.name_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def apply_change(self, df, change):
+        """
+        Derive the index of the next snapshot from this one
+
+        Normalizing and trigram-indexing the distinct names is most of the
+        build, and a delta rarely brings a name the catalog has not seen
+        before, so the name arrays are shared with this index and only the
+        rows are regrouped. A delta that does add a new name gets a full build.
+
+        Args:
+            df (DataFrame): The next snapshot's frame
+            change (RowChange): How rows of this snapshot map onto it
+
+        Returns:
+            NameSearchIndex: index over df
+        """
+        added_names = df['OBJECT_NAME'].to_numpy()[change.added]
+        present = pd.notna(added_names)
+        normalized = np.array([normalize_name(name) for name in added_names[present]], dtype=object)
+        if len(self.names) == 0:
+            return NameSearchIndex(df)
+        ids = np.minimum(np.searchsorted(self.names, normalized), len(self.names) - 1)
+        if not np.array_equal(self.names[ids], normalized):
+            return NameSearchIndex(df)
+
+        old_names = np.full(len(change.kept), -1, dtype=np.int64)
+        old_names[self.name_rows] = np.repeat(np.arange(len(self.names)), np.diff(self.name_offsets))
+        row_names = np.full(len(df), -1, dtype=np.int64)
+        kept = np.flatnonzero(change.kept)
+        row_names[change.remap[kept]] = old_names[kept]
+        added_ids = np.full(len(change.added), -1, dtype=np.int64)
+        added_ids[present] = ids
+        row_names[change.added] = added_ids
+
+        index = NameSearchIndex.__new__(NameSearchIndex)
+        index.names = self.names
+        index.trigram_counts = self.trigram_counts
+        index.trigram_names = self.trigram_names
+        index.trigram_keys = self.trigram_keys
+        index.trigram_offsets = self.trigram_offsets
+        index._group_rows(row_names)
+        return index
+
+    def _rows_of(self, name_ids, limit):
+        """
+        Row positions of the given names, in order, stopping at limit rows
+
+        Returns:
+            tuple: (row positions, index into name_ids of each row's name)
+        """
+        rows, owners = [], []
+        remaining = limit
+        for i, name_id in enumerate(name_ids):
+            start, end = self.name_offsets[name_id], self.name_offsets[name_id + 1]
+            taken = self.name_rows[start:min(end, start + remaining)]
+            rows.append(taken)
+            owners.append(np.full(len(taken), i))
+            remaining -= len(taken)
+            if remaining <= 0:
+                break
+        if not rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(rows), np.concatenate(owners)
+
+    def prefix(self, query, limit):
+        """
+        Rows whose normalized name starts with the query, alphabetically
+
+        Returns:
+            tuple: (row positions, name id of each row)
+        """
+        start = np.searchsorted(self.names, query, side='left')
+        end = np.searchsorted(self.names, query + '\U0010ffff', side='left')
+        row_start = self.name_offsets[start]
+        row_end = min(self.name_offsets[end], row_start + limit)
+        rows = self.name_rows[row_start:row_end]
+        owners = np.searchsorted(self.name_offsets, np.arange(row_start, row_end), side='right') - 1
+        return rows, owners
+
+    def fuzzy(self, query, limit, min_similarity=MIN_SIMILARITY):
+        """
+        Rows whose normalized name is similar to the query, best matches first
+
+        Returns:
+            tuple: (row positions, name id of each row, similarity of each row's name)
+        """
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0))
+        query_trigrams = _trigram_matrix([query])[0]
+        query_trigrams = query_trigrams[query_trigrams >= 0]
+        if len(self.trigram_keys) == 0 or len(query_trigrams) == 0:
+            return empty
+
+        at = np.minimum(np.searchsorted(self.trigram_keys, query_trigrams), len(self.trigram_keys) - 1)
+        at = at[self.trigram_keys[at] == query_trigrams]
+        if len(at) == 0:
+            return empty
+
+        # Count the trigrams each name shares with the query
+        postings = np.concatenate([self.trigram_names[self.trigram_offsets[i]:self.trigram_offsets[i + 1]] for i in at])
+        shared = np.bincount(postings, minlength=len(self.names))
+        candidates = np.flatnonzero(shared)
+        # Names carried forward from earlier snapshots may have no rows left
+        candidates = candidates[self.name_offsets[candidates + 1] > self.name_offsets[candidates]]
+        shared = shared[candidates]
+        similarity = shared / (len(query_trigrams) + self.trigram_counts[candidates] - shared)
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+
+        # Best names first; equal scores fall back to alphabetical order
+        if len(candidates) > limit:
+            # Keep every name tied with the limit-th best score
+            cutoff = -np.partition(-similarity, limit - 1)[limit - 1]
+            top = similarity >= cutoff
+            candidates, similarity = candidates[top], similarity[top]
+        ranked = np.lexsort((candidates, -similarity))
+        candidates, similarity = candidates[ranked], similarity[ranked]
+
+        rows, owners = self._rows_of(candidates, limit)
+        return rows, candidates[owners], similarity[owners]
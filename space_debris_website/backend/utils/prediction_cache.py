@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Most single-object results kept per model; 0 disables the cache
+MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', 10000))
+
+# Seconds a cached result stays valid
+TTL_SECONDS = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+
+# Significant digits kept of every feature when building a key, so values
+# that differ only by float formatting noise share an entry
+PRECISION = int(os.environ.get('PREDICTION_CACHE_PRECISION', 8))
+
+
+class PredictionCache:
+    """
+    LRU of single-object predictions keyed by (model version, feature vector)
+
+    The model version changes whenever the predictor's model or scaler is
+    replaced (loaded, retrained or swapped in), which drops every entry made
+    with the previous one. Results computed with an older model that arrive
+    after the switch are not stored.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, precision=PRECISION):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.precision = precision
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._model = None
+        self._scaler = None
+        self._lock = threading.Lock()
+
+    def key(self, predictor, row):
+        """
+        Cache key of one feature row for the predictor's current model
+
+        Returns:
+            tuple: (model version, quantized feature values), or None when disabled
+        """
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            if predictor.model is not self._model or predictor.scaler is not self._scaler:
+                # References are held so a new object can never reuse an old id
+                self._model, self._scaler = predictor.model, predictor.scaler
+                self._entries.clear()
+                self.version += 1
+            version = self.version
+        return version, tuple(float(f"{value:.{self.precision}g}") for value in row.tolist())
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, result):
+        if key is None:
+            return
+        with self._lock:
+            if key[0] != self.version:
+                # Computed with a model that has since been replaced
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit and miss counters for the model info endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'model_version': self.version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None
+            }
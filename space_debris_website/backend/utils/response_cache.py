@@ -0,0 +1,194 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+from utils.catalog import catalog_store
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Total bytes (all encodings) kept across cached responses
+MAX_CACHE_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+GZIP_LEVEL = 6
+# Quality 11 takes seconds on multi-megabyte payloads; 5 is close in size
+BROTLI_QUALITY = 5
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CachedBody:
+    """One response body and its compressed variants, built on demand"""
+
+    def __init__(self, body, mimetype):
+        self.mimetype = mimetype
+        self.digest = hashlib.sha1(body).hexdigest()
+        self.variants = {'identity': body}
+
+    @property
+    def size(self):
+        return sum(len(body) for body in self.variants.values())
+
+    def etag(self, encoding):
+        """Strong ETag; each content-coding gets its own validator"""
+        suffix = '' if encoding == 'identity' else f"-{encoding}"
+        return f'"{self.digest}{suffix}"'
+
+    def variant(self, encoding):
+        body = self.variants.get(encoding)
+        if body is None:
+            body = _compress(self.variants['identity'], encoding)
+            self.variants[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of response bodies keyed by (endpoint, query, catalog version)
+
+    Only entries for the most recent catalog version are kept: the first
+    response stored after a reload drops everything cached for the previous
+    one, and late responses built from an older snapshot are not stored.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        version = key[-1]
+        with self._lock:
+            if self._version is not None and version < self._version:
+                # Built from a snapshot that has since been replaced
+                return
+            if version != self._version:
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def grew(self, key, added):
+        """Account for a compressed variant added to an existing entry"""
+        with self._lock:
+            if key in self._entries:
+                self._bytes += added
+                self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+response_cache = ResponseCache()
+
+
+def _query_key():
+    """Query string normalized so parameter order does not matter"""
+    return tuple(sorted(request.args.items(multi=True)))
+
+
+def _preferred_encoding(body):
+    if len(body) < MIN_COMPRESS_BYTES:
+        return 'identity'
+    offered = ['br', 'gzip', 'identity'] if brotli is not None else ['gzip', 'identity']
+    return request.accept_encodings.best_match(offered, default='identity')
+
+
+def _matches(if_none_match, entry):
+    """Weak comparison of If-None-Match against every variant of the entry"""
+    if if_none_match.star_tag:
+        return True
+    tags = {tag.split('-')[0] for tag in if_none_match.as_set(include_weak=True)}
+    return entry.digest in tags
+
+
+def _send(entry, key):
+    """Build the 200 or 304 response for a cached body"""
+    encoding = _preferred_encoding(entry.variants['identity'])
+
+    if _matches(request.if_none_match, entry):
+        response = current_app.response_class(status=304)
+    else:
+        before = entry.size
+        body = entry.variant(encoding)
+        if entry.size != before:
+            response_cache.grew(key, entry.size - before)
+        response = current_app.response_class(body, mimetype=entry.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.headers['ETag'] = entry.etag(encoding)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Clients may keep the body but must revalidate, since the catalog can change
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def cached_response(view):
+    """
+    Cache a catalog-derived GET endpoint per catalog version
+
+    The first request for an (endpoint, query) pair runs the view and keeps
+    its body; later requests against the same catalog version are answered
+    from memory, compressed with brotli or gzip as the client accepts, and a
+    matching If-None-Match gets a 304. Only successful JSON responses are
+    cached, and requests fall through to the view if the catalog cannot be
+    loaded so it can report the error.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        snapshot, error = catalog_store.load_snapshot()
+        if error:
+            return view(*args, **kwargs)
+
+        key = (request.endpoint, tuple(sorted(kwargs.items())), _query_key(), snapshot.version)
+        entry = response_cache.get(key)
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed or response.mimetype != 'application/json':
+                return response
+            entry = CachedBody(response.get_data(), response.mimetype)
+            response_cache.put(key, entry)
+
+        return _send(entry, key)
+
+    return wrapper